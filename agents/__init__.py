@@ -1,5 +1,11 @@
 """Agent package for AETHERIUS."""
 
-from .self_forging_agent import SelfForgingAgent
-
 __all__ = ["SelfForgingAgent"]
+
+
+def __getattr__(name):
+    # Agents are imported on first access, so loading one does not load them all.
+    if name == "SelfForgingAgent":
+        from .self_forging_agent import SelfForgingAgent
+        return SelfForgingAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,71 +1,97 @@
-
 # AETHERIUS AGI - Agent Manager
 # Dispatches tasks to various sub-agents.
+#
+# Agents come from an AgentRegistry: the built-ins below plus any plugins
+# installed under the "aetherius.agents" entry-point group. Agent modules are
+# imported on first use, so adding agents does not slow down startup. Agents
+# that declare themselves cacheable have their results cached and concurrent
+# identical calls coalesced into one execution.
 
-from self_forging_agent import SelfForgingAgent
+import logging
 
+from .registry import AgentRegistry
+from .result_cache import ResultCache, SingleFlight, params_key
 
-class AgentManager:
-    def __init__(self):
-        # In a real implementation, this would dynamically load agents.
-        self.available_agents = {
-            "web_search": self.web_search_agent,
-            "self_forging": self.self_forging_agent,
-        }
-        self.self_forge = SelfForgingAgent()
+logger = logging.getLogger("aetherius.agents")
+
+# Targets are package-qualified, so the repository root must be importable.
+BUILTIN_AGENTS = {
+    "web_search": "agents.web_search_agent:WebSearchAgent",
+    "self_forging": "agents.self_forging_agent:SelfForgingAgent",
+    "code_executor": "agents.code_executor:CodeExecutorAgent",
+}
 
-    def web_search_agent(self, query):
-        """A placeholder for a web search agent."""
-        print(f"INFO: Executing web search for: '{query}'")
-        # In a real implementation, this would use a tool like Google Search.
-        return f"Search results for '{query}' would appear here."
 
-    def self_forging_agent(self):
-        """Invoke the self-forging agent to generate an income strategy."""
-        strategy = self.self_forge.synthesize_income_generator()
-        return {
-            "codename": strategy.codename,
-            "vision": strategy.vision_statement,
-            "signature_assets": strategy.signature_assets,
-            "income_streams": [
-                {
-                    "name": stream.name,
-                    "description": stream.description,
-                    "delivery_modes": stream.delivery_modes,
-                    "pricing_model": stream.pricing_model,
-                }
-                for stream in strategy.income_streams
-            ],
-            "launch_sequence": [
-                {
-                    "title": step.title,
-                    "detail": step.detail,
-                    "owner": step.owner,
-                }
-                for step in strategy.launch_sequence
-            ],
-            "automation_hooks": strategy.automation_hooks,
-        }
+class AgentManager:
+    def __init__(self, registry=None, pool_size=4, load_plugins=True, result_cache=None):
+        if registry is None:
+            registry = AgentRegistry(pool_size)
+            for name, target in BUILTIN_AGENTS.items():
+                registry.register(name, target)
+            if load_plugins:
+                registry.load_entry_points()
+        self.registry = registry
+        self.result_cache = result_cache or ResultCache()
+        self.single_flight = SingleFlight()
+        self._runners = {}
+        self._generation = registry.generation
+
+    @property
+    def available_agents(self):
+        return self.registry.names()
 
     def execute_task(self, agent_name, **kwargs):
         """Executes a task using the specified agent."""
-        if agent_name in self.available_agents:
-            agent_function = self.available_agents[agent_name]
-            return agent_function(**kwargs)
-        else:
-            return f"ERROR: Agent '{agent_name}' not found."
+        if self._generation != self.registry.generation:
+            # An agent was (re-)registered; drop runners bound to the old target.
+            self._runners = {}
+            self._generation = self.registry.generation
+        runner = self._runners.get(agent_name)
+        if runner is None:
+            if agent_name not in self.registry:
+                return f"ERROR: Agent '{agent_name}' not found."
+            runner = self._runners[agent_name] = self._runner(agent_name)
+        return runner(**kwargs)
 
-# Example Usage (for testing)
+    def _runner(self, agent_name):
+        run = self.registry.runner(agent_name)
+        cacheable, ttl = self.registry.policy(agent_name)
+        if not cacheable:
+            return run
+        cache, single_flight = self.result_cache, self.single_flight
+
+        def run_cached(**kwargs):
+            key = params_key(kwargs)
+            hit, result = cache.get(agent_name, key)
+            if hit:
+                return result
+
+            def compute():
+                # A flight that finished since the lookup above has filled the cache.
+                hit, result = cache.get(agent_name, key, record=False)
+                if hit:
+                    return result
+                result = run(**kwargs)
+                cache.put(agent_name, key, result, ttl)
+                return result
+            return single_flight.do((agent_name, key), compute)
+        return run_cached
+
+    def invalidate(self, agent_name=None, **params):
+        """Drops cached results: all, one agent's, or one agent's for `params`."""
+        self.result_cache.invalidate(agent_name, params or None)
+
+# Example Usage (for testing); run `python -m agents.agent_manager` from the repository root.
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
     agent_manager = AgentManager()
     result = agent_manager.execute_task("web_search", query="What is AGI?")
     print(f"\nAgent Result: {result}")
 
-    result_fail = agent_manager.execute_task("code_executor", code="print('Hello World')")
-    print(f"Agent Result: {result_fail}")
+    code_result = agent_manager.execute_task("code_executor", code="print('Hello World')")
+    print(f"Agent Result: {code_result}")
 
     self_forge_result = agent_manager.execute_task("self_forging")
     print("\nSelf-Forging Strategy:")
     for key, value in self_forge_result.items():
         print(f"- {key}: {value}")
-
@@ -0,0 +1,353 @@
+# AETHERIUS AGI - Code Executor Agent
+# Runs Python snippets in resource-limited worker subprocesses.
+#
+# Workers are started ahead of time and reused, so a call costs a pipe round
+# trip instead of an interpreter start. Each worker runs one snippet at a time
+# under rlimits (address space, CPU seconds per snippet, file size, open
+# files) inside a scratch directory; the parent enforces wall time and kills
+# and replaces any worker that overruns or dies. Between snippets the worker
+# empties its scratch directory, and it is replaced rather than reused when a
+# snippet left interpreter state behind (imported or patched modules, changed
+# builtins, sys.path or environment, running threads, open files), so one
+# caller's snippet cannot affect the next. This isolates crashes and runaway
+# snippets from the agent process, but it is not a security sandbox for
+# hostile code: use OS-level isolation (containers, seccomp) for that.
+#
+# Parent and worker exchange length-prefixed JSON messages over the worker's
+# original stdin/stdout; the snippet itself sees /dev/null on both.
+
+import atexit
+import io
+import json
+import logging
+import os
+import queue
+import select
+import shutil
+import signal
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stderr, redirect_stdout
+
+logger = logging.getLogger("aetherius.agents")
+
+_HEADER = struct.Struct(">I")
+# Bound once, so a snippet that patches the json module cannot garble replies.
+_dumps, _loads = json.dumps, json.loads
+
+
+def _send(stream, message):
+    payload = _dumps(message).encode("utf-8")
+    stream.write(_HEADER.pack(len(payload)) + payload)
+    stream.flush()
+
+
+def _read_exactly(fd, size, deadline):
+    """Reads `size` bytes from `fd`; None on EOF, TimeoutError past `deadline`."""
+    chunks = []
+    while size:
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            raise TimeoutError
+        ready, _, _ = select.select([fd], [], [], remaining)
+        if not ready:
+            raise TimeoutError
+        chunk = os.read(fd, size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _receive(fd, deadline=None):
+    header = _read_exactly(fd, _HEADER.size, deadline)
+    if header is None:
+        return None
+    payload = _read_exactly(fd, _HEADER.unpack(header)[0], deadline)
+    return None if payload is None else _loads(payload)
+
+
+# ----------------------------------------------------------------------
+# Worker side
+# ----------------------------------------------------------------------
+def _execute(code, max_output):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    reply = {"status": "ok", "value": None}
+    started = time.perf_counter()
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            namespace = {"__name__": "__snippet__"}
+            try:
+                expression = compile(code, "<snippet>", "eval")
+            except SyntaxError:
+                exec(compile(code, "<snippet>", "exec"), namespace)
+            else:
+                value = eval(expression, namespace)
+                reply["value"] = None if value is None else repr(value)[:max_output]
+    except MemoryError:
+        reply = {"status": "error", "error": "MemoryError: snippet exceeded its memory limit"}
+    except BaseException as exc:  # SystemExit and KeyboardInterrupt included
+        reply = {"status": "error", "error": f"{type(exc).__name__}: {exc}"}
+    reply["stdout"] = stdout.getvalue()[:max_output]
+    reply["stderr"] = stderr.getvalue()[:max_output]
+    reply["duration"] = time.perf_counter() - started
+    return reply
+
+
+def _open_files():
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:  # pragma: no cover - no procfs
+        return None
+
+
+def _interpreter_state():
+    """What a snippet could leave behind for the next one, captured by identity."""
+    modules = [
+        (name, module, list(getattr(module, "__dict__", {}).values()))
+        for name, module in sys.modules.items()
+    ]
+    return modules, list(sys.path), dict(os.environ), _open_files()
+
+
+def _state_changed(state):
+    modules, path, environ, open_files = state
+    if len(modules) != len(sys.modules):
+        return True
+    for name, module, values in modules:
+        if sys.modules.get(name) is not module:
+            return True
+        # List comparison checks identity before equality, so this is cheap
+        # when nothing changed and still catches any replaced attribute.
+        if list(getattr(module, "__dict__", {}).values()) != values:
+            return True
+    return (
+        sys.path != path or os.environ != environ or threading.active_count() > 1
+        or _open_files() != open_files
+    )
+
+
+def _clear_directory(path):
+    os.chdir(path)
+    for entry in os.scandir(path):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            os.unlink(entry.path)
+
+
+def _worker_main(limits):
+    import resource
+
+    # Keep the protocol channels private and hand the snippet /dev/null.
+    requests = os.dup(0)
+    replies = os.fdopen(os.dup(1), "wb")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    channels = [os.fstat(fd)[:2] for fd in (requests, replies.fileno())]
+    workdir = os.getcwd()
+
+    memory = limits["memory_mb"] * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (limits["file_bytes"],) * 2)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (limits["open_files"],) * 2)
+    # Run each kind of snippet once so lazy imports on those paths are not
+    # mistaken for state left behind by the first real snippet.
+    for code in ("None", "pass", "1/0", "("):
+        _execute(code, limits["max_output"])
+    clean = _interpreter_state()
+    _send(replies, {"status": "ready"})
+    while True:
+        request = _receive(requests)
+        if request is None:
+            return
+        # RLIMIT_CPU counts the worker's lifetime, so move the soft limit
+        # to "now + budget" before each snippet; overrunning raises SIGXCPU.
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        spent = int(usage.ru_utime + usage.ru_stime)
+        budget = spent + max(1, int(round(request["cpu_time"])))
+        resource.setrlimit(resource.RLIMIT_CPU, (budget, resource.RLIM_INFINITY))
+        reply = _execute(request["code"], limits["max_output"])
+        try:
+            if [os.fstat(fd)[:2] for fd in (requests, replies.fileno())] != channels:
+                return  # the snippet replaced a protocol channel; nothing can be trusted
+        except OSError:
+            return
+        _clear_directory(workdir)
+        reply["id"] = request["id"]
+        reply["recycle"] = _state_changed(clean)
+        _send(replies, reply)
+
+
+# ----------------------------------------------------------------------
+# Parent side
+# ----------------------------------------------------------------------
+class _Worker:
+    def __init__(self, limits):
+        self.workdir = tempfile.mkdtemp(prefix="aetherius-code-")
+        self.process = subprocess.Popen(
+            [sys.executable, "-I", os.path.abspath(__file__), "--worker", json.dumps(limits)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            cwd=self.workdir, env={"PATH": os.environ.get("PATH", "")},
+        )
+        self.tasks = 0
+        self.ready = False
+
+    def wait_ready(self, timeout):
+        if not self.ready:
+            hello = _receive(self.process.stdout.fileno(), time.monotonic() + timeout)
+            if hello is None or hello.get("status") != "ready":
+                raise RuntimeError("Code executor worker failed to start")
+            self.ready = True
+
+    def call(self, request, timeout):
+        self.tasks += 1
+        _send(self.process.stdin, {**request, "id": self.tasks})
+        try:
+            reply = _receive(self.process.stdout.fileno(), time.monotonic() + timeout)
+        except ValueError:
+            raise RuntimeError("Code executor worker sent a malformed reply") from None
+        if reply is not None and reply.pop("id", None) != self.tasks:
+            raise RuntimeError("Code executor worker sent a reply out of turn")
+        return reply
+
+    def kill(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            stream.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+class CodeExecutorPool:
+    """Pre-started pool of snippet workers.
+
+    `size` workers run snippets in parallel (default: one per core).
+    `cpu_time` and `wall_time` bound each snippet in seconds, `memory_mb`
+    bounds each worker's address space. Workers are replaced after
+    `max_tasks_per_worker` snippets, after a snippet that left interpreter
+    state behind, or whenever one is killed.
+    """
+
+    def __init__(self, size=None, cpu_time=2.0, wall_time=5.0, memory_mb=512,
+                 max_tasks_per_worker=200, max_output=65536, startup_timeout=30.0):
+        self.size = size or os.cpu_count() or 1
+        self.cpu_time = cpu_time
+        self.wall_time = wall_time
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.startup_timeout = startup_timeout
+        self.limits = {
+            "memory_mb": memory_mb,
+            "file_bytes": 16 * 1024 * 1024,
+            "open_files": 64,
+            "max_output": max_output,
+        }
+        self.respawns = 0
+        self._idle = queue.LifoQueue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._workers = set()
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self):
+        worker = _Worker(self.limits)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _retire(self, worker):
+        with self._lock:
+            self._workers.discard(worker)
+        worker.kill()
+
+    def run(self, code, cpu_time=None, wall_time=None):
+        """Runs `code` on an idle worker and returns its result record.
+
+        A single expression's repr comes back as "value". The record's
+        "status" is "ok", "error", "timeout" (wall time exceeded) or "killed"
+        (the worker died, e.g. on the CPU limit).
+        """
+        if self._closed:
+            raise RuntimeError("CodeExecutorPool is closed")
+        wall_time = wall_time or self.wall_time
+        request = {"code": code, "cpu_time": cpu_time or self.cpu_time}
+        worker = self._idle.get()
+        replace = True
+        started = time.perf_counter()
+        try:
+            worker.wait_ready(self.startup_timeout)
+            reply = worker.call(request, wall_time)
+            if reply is None:
+                returncode = worker.process.wait()
+                error = f"Worker exited with code {returncode}"
+                if returncode == -signal.SIGXCPU:
+                    error = f"Snippet exceeded its {request['cpu_time']}s CPU time"
+                reply = {"status": "killed", "error": error}
+            else:
+                recycle = reply.pop("recycle", True)
+                replace = recycle or worker.tasks >= self.max_tasks_per_worker
+        except TimeoutError:
+            reply = {"status": "timeout", "error": f"Snippet exceeded its {wall_time}s wall time"}
+        except RuntimeError as exc:
+            reply = {"status": "killed", "error": str(exc)}
+        finally:
+            if replace:
+                self._retire(worker)
+                if not self._closed:
+                    self.respawns += 1
+                    worker = self._spawn()
+            if not self._closed:
+                self._idle.put(worker)
+        reply.setdefault("duration", time.perf_counter() - started)
+        return reply
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            self._retire(worker)
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_pool():
+    """The process-wide pool used by CodeExecutorAgent, started on first use."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = CodeExecutorPool()
+            atexit.register(_shared_pool.close)
+        return _shared_pool
+
+
+class CodeExecutorAgent:
+    def __init__(self, pool=None):
+        self.pool = pool or shared_pool()
+
+    def run(self, code, timeout=None):
+        """Executes a Python snippet in an isolated worker process."""
+        logger.info("Executing code snippet: %.50s", code)
+        return self.pool.run(code, wall_time=timeout)
+
+
+if __name__ == "__main__" and sys.argv[1:2] == ["--worker"]:
+    _worker_main(json.loads(sys.argv[2]))
+elif __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    pool = CodeExecutorPool(size=2, wall_time=2.0)
+    print(pool.run("sum(range(10))"))
+    print(pool.run("print('Hello World')"))
+    print(pool.run("while True: pass"))
+    print(pool.run("1/0"))
+    pool.close()
@@ -0,0 +1,158 @@
+# AETHERIUS AGI - Agent Registry
+# Lazily loaded agent plugins with pools of warm instances.
+#
+# An agent is registered by name with a "module:attribute" target, either in
+# code or through the "aetherius.agents" entry-point group of an installed
+# package:
+#
+#   [project.entry-points."aetherius.agents"]
+#   translator = "my_package.agents:TranslatorAgent"
+#
+# Nothing is imported until an agent is first used. A class target is an
+# agent whose instances expose run(**params); instances are pooled, so hot
+# agents are constructed once and reused. Any other callable is called directly.
+
+import importlib
+import logging
+import threading
+from importlib.metadata import entry_points
+
+logger = logging.getLogger("aetherius.agents")
+
+ENTRY_POINT_GROUP = "aetherius.agents"
+
+
+class AgentPool:
+    """Idle instances of one agent class, kept warm for reuse.
+
+    Each instance serves one task at a time. At most `size` idle instances
+    are kept; extra instances built under load are discarded on release.
+    """
+
+    def __init__(self, factory, size=4):
+        self.factory = factory
+        self.size = size
+        self.created = 0
+        self.reused = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+            self.created += 1
+        return self.factory()
+
+    def release(self, agent):
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(agent)
+
+    def warm(self, count=None):
+        """Builds idle instances up front, up to `count` (default: the pool size)."""
+        with self._lock:
+            missing = min(self.size, count or self.size) - len(self._idle)
+            self.created += max(0, missing)
+        built = [self.factory() for _ in range(missing)]
+        with self._lock:
+            self._idle.extend(built)
+
+
+class AgentRegistry:
+    def __init__(self, pool_size=4):
+        self.pool_size = pool_size
+        self._targets = {}
+        self._pool_sizes = {}
+        self._loaded = {}
+        self._lock = threading.Lock()
+        # Bumped by every register(), so callers caching runners can tell
+        # when a target may have changed.
+        self.generation = 0
+
+    def __contains__(self, name):
+        return name in self._targets
+
+    def names(self):
+        return sorted(self._targets)
+
+    def register(self, name, target, pool_size=None):
+        """Registers `target` ("module:attribute", a class or a callable) as `name`."""
+        with self._lock:
+            self._targets[name] = target
+            self._loaded.pop(name, None)
+            self.generation += 1
+            if pool_size is not None:
+                self._pool_sizes[name] = pool_size
+
+    def load_entry_points(self, group=ENTRY_POINT_GROUP):
+        """Registers installed plugins; names registered in code take precedence."""
+        for entry_point in entry_points(group=group):
+            if entry_point.name not in self._targets:
+                self.register(entry_point.name, entry_point.value)
+
+    def _load(self, name):
+        with self._lock:
+            handle = self._loaded.get(name)
+            if handle is not None:
+                return handle
+            target = self._targets[name]
+            if isinstance(target, str):
+                module_name, _, attribute = target.partition(":")
+                target = importlib.import_module(module_name)
+                for part in attribute.split("."):
+                    target = getattr(target, part)
+                logger.info("Loaded agent '%s' from %s", name, module_name)
+            if isinstance(target, type):
+                handle = AgentPool(target, self._pool_sizes.get(name, self.pool_size))
+            else:
+                handle = target
+            self._loaded[name] = handle
+            return handle
+
+    def policy(self, name):
+        """(cacheable, cache_ttl) as declared by the agent, importing it now."""
+        handle = self._load(name)
+        declared = handle.factory if isinstance(handle, AgentPool) else handle
+        return getattr(declared, "cacheable", False), getattr(declared, "cache_ttl", None)
+
+    def runner(self, name):
+        """Returns a callable running agent `name`, importing it now.
+
+        Callers that dispatch often should keep the runner: it skips the
+        registry lookups that run() repeats on every call.
+        """
+        handle = self._load(name)
+        if not isinstance(handle, AgentPool):
+            return handle
+        acquire, release = handle.acquire, handle.release
+
+        def run_pooled(**params):
+            agent = acquire()
+            try:
+                return agent.run(**params)
+            finally:
+                release(agent)
+        return run_pooled
+
+    def run(self, name, **params):
+        """Runs agent `name` on `params`, importing it on first use."""
+        return self.runner(name)(**params)
+
+    def warm(self, *names):
+        """Imports the named agents (default: all) and fills their pools."""
+        for name in names or self.names():
+            handle = self._load(name)
+            if isinstance(handle, AgentPool):
+                handle.warm()
+
+    def stats(self):
+        return {
+            name: {
+                "loaded": name in self._loaded,
+                "created": getattr(self._loaded.get(name), "created", None),
+                "reused": getattr(self._loaded.get(name), "reused", None),
+            }
+            for name in self.names()
+        }
@@ -0,0 +1,110 @@
+# AETHERIUS AGI - Agent Result Cache
+# Per-agent result caching and single-flight coalescing of identical calls.
+#
+# Both apply only to agents that declare themselves pure, i.e. whose result
+# depends on nothing but their params:
+#
+#   class MyAgent:
+#       cacheable = True    # results may be cached and shared
+#       cache_ttl = 300.0   # seconds; None keeps results until evicted
+#
+# Cached results are shared between callers and must be treated as read-only.
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+def params_key(params):
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers share its outcome."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key, function):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            result = function()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class ResultCache:
+    """LRU cache of agent results with per-agent TTLs and size limits."""
+
+    def __init__(self, max_entries_per_agent=1024):
+        self.max_entries_per_agent = max_entries_per_agent
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, agent_name, key, record=True):
+        """Returns (True, result) on a live hit, else (False, None).
+
+        `record=False` leaves the hit/miss counters alone, for re-checks.
+        """
+        with self._lock:
+            entries = self._entries.get(agent_name)
+            entry = entries.get(key) if entries else None
+            if entry is not None:
+                result, expires_at = entry
+                if expires_at is None or time.monotonic() < expires_at:
+                    entries.move_to_end(key)
+                    self.hits += record
+                    return True, result
+                del entries[key]
+            self.misses += record
+            return False, None
+
+    def put(self, agent_name, key, result, ttl=None):
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            entries = self._entries.setdefault(agent_name, OrderedDict())
+            entries[key] = (result, expires_at)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries_per_agent:
+                entries.popitem(last=False)
+
+    def invalidate(self, agent_name=None, params=None):
+        """Drops everything, one agent's results, or one agent's result for `params`."""
+        with self._lock:
+            if agent_name is None:
+                self._entries.clear()
+            elif params is None:
+                self._entries.pop(agent_name, None)
+            else:
+                self._entries.get(agent_name, {}).pop(params_key(params), None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": {name: len(entries) for name, entries in self._entries.items()},
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
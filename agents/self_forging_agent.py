@@ -123,6 +123,9 @@ class ForgedStrategy:
 class SelfForgingAgent:
     """Transforms sigil symbolism into a revenue strategy."""
 
+    # Deterministic for a given archive, so results are cached after the first call.
+    cacheable = True
+
     def __init__(self, archive: Dict[str, Dict[str, List[str]]] | None = None) -> None:
         self.archive = archive or SIGIL_ARCHIVE
 
@@ -177,6 +180,34 @@ class SelfForgingAgent:
             automation_hooks=automation_hooks,
         )
 
+    def run(self) -> Dict[str, object]:
+        """Agent entry point: the income strategy as plain, serialisable data."""
+
+        strategy = self.synthesize_income_generator()
+        return {
+            "codename": strategy.codename,
+            "vision": strategy.vision_statement,
+            "signature_assets": strategy.signature_assets,
+            "income_streams": [
+                {
+                    "name": stream.name,
+                    "description": stream.description,
+                    "delivery_modes": stream.delivery_modes,
+                    "pricing_model": stream.pricing_model,
+                }
+                for stream in strategy.income_streams
+            ],
+            "launch_sequence": [
+                {
+                    "title": step.title,
+                    "detail": step.detail,
+                    "owner": step.owner,
+                }
+                for step in strategy.launch_sequence
+            ],
+            "automation_hooks": strategy.automation_hooks,
+        }
+
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
@@ -0,0 +1,150 @@
+# AETHERIUS AGI - Task Executor
+# Runs scheduled tasks on sub-agents concurrently with bounded worker pools.
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import (
+    CancelledError,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    TimeoutError as FutureTimeoutError,
+)
+
+from .agent_manager import AgentManager
+
+# Each process-pool worker builds its own AgentManager on first use.
+_process_agent_manager = None
+
+
+def _run_in_process(agent_name, params):
+    global _process_agent_manager
+    if _process_agent_manager is None:
+        _process_agent_manager = AgentManager()
+    return _process_agent_manager.execute_task(agent_name, **params)
+
+
+class TaskBatch:
+    """Handle on a submitted set of tasks; results come back in task order."""
+
+    def __init__(self, tasks, futures, default_timeout):
+        self.tasks = tasks
+        self.futures = futures
+        self.default_timeout = default_timeout
+        self._started = time.monotonic()
+        self._finished = [None] * len(futures)
+        for position, future in enumerate(futures):
+            future.add_done_callback(
+                lambda _, position=position: self._finished.__setitem__(position, time.monotonic())
+            )
+
+    def cancel(self):
+        """Cancels every task that has not started yet."""
+        for future in self.futures:
+            future.cancel()
+
+    def results(self):
+        """Waits for each task within its own timeout and returns one result per task.
+
+        Each result is {"task_name", "agent", "status", "result" | "error",
+        "duration"} where status is "ok", "error", "timeout" or "cancelled".
+        A task that times out is cancelled if it has not started; a running
+        thread cannot be interrupted, so its eventual result is discarded.
+        """
+        return [
+            self._result(position, task, future)
+            for position, (task, future) in enumerate(zip(self.tasks, self.futures))
+        ]
+
+    def _result(self, position, task, future):
+        record = {"task_name": task.get("task_name"), "agent": task.get("agent")}
+        timeout = task.get("timeout", self.default_timeout)
+        remaining = None
+        if timeout is not None:
+            remaining = max(0.0, self._started + timeout - time.monotonic())
+        try:
+            record["result"] = future.result(timeout=remaining)
+            record["status"] = "ok"
+        except FutureTimeoutError:
+            future.cancel()
+            record["status"] = "timeout"
+            record["error"] = f"Task exceeded its {timeout}s timeout"
+        except CancelledError:
+            record["status"] = "cancelled"
+            record["error"] = "Task was cancelled"
+        except Exception as exc:
+            record["status"] = "error"
+            record["error"] = f"{type(exc).__name__}: {exc}"
+        finished = self._finished[position] or time.monotonic()
+        record["duration"] = finished - self._started
+        return record
+
+
+class TaskExecutor:
+    """Dispatches tasks to AgentManager agents on shared worker pools.
+
+    I/O-bound agents (the default) run on a thread pool sharing the
+    executor's AgentManager. Agents listed as "cpu" in `agent_pools` run on
+    a process pool so they can use every core.
+    """
+
+    def __init__(self, agent_manager=None, max_io_workers=16, max_cpu_workers=None,
+                 agent_pools=None, default_timeout=None, tracer=None):
+        self.agent_manager = agent_manager or AgentManager()
+        self.max_io_workers = max_io_workers
+        self.max_cpu_workers = max_cpu_workers or os.cpu_count() or 1
+        self.agent_pools = dict(agent_pools or {})
+        self.default_timeout = default_timeout
+        self.tracer = tracer
+        self._io_pool = None
+        self._cpu_pool = None
+        self._lock = threading.Lock()
+
+    def _pool_for(self, agent_name):
+        with self._lock:
+            if self.agent_pools.get(agent_name) == "cpu":
+                if self._cpu_pool is None:
+                    # Spawned, not forked: forking while I/O threads hold the
+                    # import lock (agents load lazily) deadlocks the child.
+                    self._cpu_pool = ProcessPoolExecutor(
+                        self.max_cpu_workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                return self._cpu_pool
+            if self._io_pool is None:
+                self._io_pool = ThreadPoolExecutor(
+                    self.max_io_workers, thread_name_prefix="aetherius-agent"
+                )
+            return self._io_pool
+
+    def submit(self, task):
+        """Starts one task ({"agent", "params", ...}) and returns its Future."""
+        agent_name = task["agent"]
+        params = task.get("params", {})
+        pool = self._pool_for(agent_name)
+        submitted = time.perf_counter()
+        if pool is self._cpu_pool:
+            future = pool.submit(_run_in_process, agent_name, params)
+        else:
+            future = pool.submit(self.agent_manager.execute_task, agent_name, **params)
+        if self.tracer is not None:
+            # Spans cover queueing plus execution, measured from submission.
+            future.add_done_callback(lambda _: self.tracer.record(
+                f"agent.{agent_name}", "agent", submitted, time.perf_counter(),
+                {"task_name": task.get("task_name")},
+            ))
+        return future
+
+    def submit_all(self, tasks):
+        tasks = list(tasks)
+        return TaskBatch(tasks, [self.submit(task) for task in tasks], self.default_timeout)
+
+    def run(self, tasks):
+        """Runs tasks concurrently and returns their results in task order."""
+        return self.submit_all(tasks).results()
+
+    def shutdown(self, wait=True):
+        for pool in (self._io_pool, self._cpu_pool):
+            if pool is not None:
+                pool.shutdown(wait=wait, cancel_futures=True)
+        self._io_pool = self._cpu_pool = None
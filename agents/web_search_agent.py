@@ -0,0 +1,18 @@
+# AETHERIUS AGI - Web Search Agent
+# Placeholder search agent.
+
+import logging
+
+logger = logging.getLogger("aetherius.agents")
+
+
+class WebSearchAgent:
+    # Identical queries within the TTL share one search.
+    cacheable = True
+    cache_ttl = 300.0
+
+    def run(self, query):
+        """A placeholder for a web search agent."""
+        logger.info("Executing web search for: '%s'", query)
+        # In a real implementation, this would use a tool like Google Search.
+        return f"Search results for '{query}' would appear here."
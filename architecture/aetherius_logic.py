@@ -1,51 +1,125 @@
 # AETHERIUS AGI - Logic Stubs
 # This file contains placeholder functions for the core AGI loop.
 
+import logging
+
+from affect_lexicon import default_lexicon
+from prompt_templates import build_prompt, get_template
+from task_graph import DagScheduler
+
+logger = logging.getLogger("aetherius.logic")
+
+# Upper bound on the inner-monologue prompt, memories included.
+MONOLOGUE_TOKEN_BUDGET = 1024
+
 def listen():
     """Listens for user input."""
-    print("INFO: Listening for user input...")
+    logger.info("Listening for user input...")
     return input("> ")
 
+def expand_inputs(user_inputs):
+    """Expands a batch of inputs, tagging each with its affect-category vector.
+
+    "affect" maps Roget Class VI categories to weights (unit L2 norm), for
+    ranking memories and responses by emotional tone downstream.
+    """
+    affect = default_lexicon().affect(user_inputs)
+    return [
+        {"text": text, "intent": "unknown", "affect": vector}
+        for text, vector in zip(user_inputs, affect)
+    ]
+
 def expand_input(user_input):
     """Expands the user input into a richer representation."""
-    print(f"INFO: Expanding input: {user_input}")
-    return {"text": user_input, "intent": "unknown"}
+    logger.info("Expanding input: %s", user_input)
+    return expand_inputs([user_input])[0]
 
-def memory_search(expanded_input):
+def memory_search(expanded_input, memory=None, filters=None):
     """Searches memory for relevant candidates."""
-    print(f"INFO: Searching memory for: {expanded_input}")
-    return []
+    logger.info("Searching memory for: %s", expanded_input)
+    if memory is None:
+        return []
+    return memory.search_memory(expanded_input["text"], filters=filters)
+
+def generate_inner_monologue(candidates, llm=None, user_input=""):
+    """Generates an internal dialogue to reason about the situation.
 
-def generate_inner_monologue(candidates):
-    """Generates an internal dialogue to reason about the situation."""
-    print(f"INFO: Generating inner monologue with candidates: {candidates}")
-    return "Thinking about what to do..."
+    Memory candidates are packed into the prompt under MONOLOGUE_TOKEN_BUDGET.
+    """
+    logger.info("Generating inner monologue with candidates: %s", candidates)
+    if llm is None:
+        return "Thinking about what to do..."
+    prompt = build_prompt(
+        "inner_monologue", MONOLOGUE_TOKEN_BUDGET, candidates, user_input=user_input
+    )
+    return llm.generate_response(prompt)
 
 def generate_intuition(monologue):
     """Formulates a plan of action."""
-    print(f"INFO: Generating intuition from monologue: {monologue}")
+    logger.info("Generating intuition from monologue: %s", monologue)
     return ["action1", "action2"]
 
 def schedule_tasks(plan):
     """Breaks the plan down into executable tasks."""
-    print(f"INFO: Scheduling tasks for plan: {plan}")
-    return [{"task_name": "task1", "params": {}}, {"task_name": "task2", "params": {}}]
+    logger.info("Scheduling tasks for plan: %s", plan)
+    # Each step becomes a task in a dependency graph; steps that consume an
+    # earlier step's output list it in "inputs" and reference it as "$name".
+    return [
+        {
+            "task_name": f"task{i}",
+            "agent": "web_search",
+            "params": {"query": step},
+            "inputs": [],
+            "outputs": [f"task{i}_result"],
+        }
+        for i, step in enumerate(plan, 1)
+    ]
 
-def execute_subagents(tasks):
-    """Executes tasks via sub-agents."""
-    print(f"INFO: Executing subagents for tasks: {tasks}")
-    return [{"result": "success"}, {"result": "success"}]
+def execute_subagents(tasks, executor=None):
+    """Executes the task graph via sub-agents, running ready tasks in parallel."""
+    logger.info("Executing subagents for tasks: %s", tasks)
+    if executor is None:
+        return [{"task_name": task["task_name"], "status": "skipped"} for task in tasks]
+    run = DagScheduler(executor, executor.default_timeout).run(tasks)
+    logger.info(
+        "Critical path %s took %.3fs of %.3fs",
+        " -> ".join(run["critical_path"]), run["critical_path_seconds"], run["makespan"],
+    )
+    return run["results"]
 
-def compose_response(monologue, agent_results):
-    """Formulates a response based on the internal monologue and agent results."""
-    print(f"INFO: Composing response from monologue and results: {monologue}, {agent_results}")
-    return "I have completed the tasks."
+def compose_response(monologue, agent_results, llm=None):
+    """Formulates a response based on the internal monologue and agent results.
 
-def update_memory(expanded_input, monologue, response):
+    With an LLM connector the response is a token iterator that is already
+    generating, so `speak` can show the first tokens as soon as they arrive.
+    """
+    logger.info("Composing response from monologue and results: %s, %s", monologue, agent_results)
+    if llm is None:
+        return "I have completed the tasks."
+    outcomes = ", ".join(f"{result['task_name']}: {result['status']}" for result in agent_results)
+    return llm.stream(get_template("compose_response").render(monologue=monologue, outcomes=outcomes))
+
+def update_memory(expanded_input, monologue, response, memory=None, metadata=None):
     """Updates memory with the new experience."""
-    print(f"INFO: Updating memory with: {expanded_input}, {monologue}, {response}")
-    pass
+    logger.info("Updating memory with: %s, %s, %s", expanded_input, monologue, response)
+    if memory is not None:
+        memory.store_memories(
+            [f"User: {expanded_input['text']}", f"AETHERIUS: {response}"],
+            [metadata, metadata],
+        )
 
 def speak(response):
-    """Delivers the response to the user."""
-    print(f"AETHERIUS: {response}")
+    """Delivers the response to the user, token by token if it is streamed.
+
+    Returns the full text that was spoken.
+    """
+    if isinstance(response, str):
+        print(f"AETHERIUS: {response}")
+        return response
+    print("AETHERIUS: ", end="", flush=True)
+    tokens = []
+    for token in response:
+        print(token, end="", flush=True)
+        tokens.append(token)
+    print()
+    return "".join(tokens)
@@ -0,0 +1,160 @@
+# AETHERIUS AGI - Affect Lexicon
+# Maps input text onto the affect and moral categories of Roget's Class VI.
+#
+# The thesaurus is compiled once into a lookup table (word or stem -> row) and
+# a CSR matrix of rows to categories. A batch of texts is tokenized, each
+# distinct word is resolved once (exact term, then stem, then fuzzy match for
+# longer words) and cached, and the category weights of all texts are summed
+# in a single vectorized pass. Each text comes out as a sparse, L2-normalized
+# category vector that downstream ranking can compare with a dot product.
+# A term listed under several categories ("awe": Wonder and Reverence)
+# splits its weight between them.
+
+import functools
+import re
+from itertools import chain
+
+import numpy as np
+
+from roget_fuzzy import FuzzyMatcher, default_matcher, stem
+from roget_index import default_index
+
+_WORD_RE = re.compile(r"[a-z]+(?:[-'][a-z]+)*")
+
+
+class AffectLexicon:
+    """Term -> category table over a ThesaurusIndex.
+
+    `categories` names the vector dimensions. Words of at least
+    `min_fuzzy_length` characters that match no term exactly or by stem fall
+    back to the fuzzy matcher, weighted by the match score, when `fuzzy` is on.
+    """
+
+    def __init__(self, index=None, fuzzy=True, min_fuzzy_score=0.8, min_fuzzy_length=5,
+                 cache_size=65536):
+        if index is None:
+            index = default_index()
+            self._matcher = default_matcher() if fuzzy else None
+        else:
+            self._matcher = FuzzyMatcher(index.terms()) if fuzzy else None
+        self.min_fuzzy_score = min_fuzzy_score
+        self.min_fuzzy_length = min_fuzzy_length
+
+        columns = {}
+        row_columns = []
+        self._rows = {}
+        self._phrases = {}
+        for term in index.terms():
+            heads = [columns.setdefault(head, len(columns)) for head in index.categories(term)]
+            self._rows[term] = len(row_columns)
+            row_columns.append(heads)
+            words = tuple(_WORD_RE.findall(term))
+            if len(words) > 1:
+                self._phrases.setdefault(words[0], []).append((words, self._rows[term]))
+        # Stems of terms resolve to the union of those terms' categories,
+        # unless the stem is itself a term.
+        stem_columns = {}
+        for term, row in list(self._rows.items()):
+            key = stem(term)
+            if key not in self._rows:
+                stem_columns.setdefault(key, {}).update(dict.fromkeys(row_columns[row]))
+        for key, heads in stem_columns.items():
+            self._rows[key] = len(row_columns)
+            row_columns.append(list(heads))
+
+        self.categories = list(columns)
+        self._indptr = np.zeros(len(row_columns) + 1, dtype=np.int64)
+        np.cumsum([len(heads) for heads in row_columns], out=self._indptr[1:])
+        self._columns = np.fromiter(chain.from_iterable(row_columns), dtype=np.int32,
+                                    count=int(self._indptr[-1]))
+        self._row_weight = 1.0 / np.maximum(np.diff(self._indptr), 1)
+        self._resolve = functools.lru_cache(maxsize=cache_size)(self._lookup)
+
+    def __len__(self):
+        return len(self.categories)
+
+    def _lookup(self, word):
+        """Returns (row, weight) for `word`, or (-1, 0.0) if it has no category."""
+        row = self._rows.get(word)
+        if row is None:
+            row = self._rows.get(stem(word))
+        if row is not None:
+            return row, 1.0
+        if self._matcher is not None and len(word) >= self.min_fuzzy_length:
+            matches = self._matcher.match(word, 1, self.min_fuzzy_score)
+            if matches:
+                return self._rows[matches[0].term], matches[0].score
+        return -1, 0.0
+
+    def _phrase_hits(self, tokens, doc_ids):
+        """(doc, row) pairs for multi-word terms such as "aesthetic sense"."""
+        hits = []
+        for i, token in enumerate(tokens):
+            for words, row in self._phrases.get(token, ()):
+                end = i + len(words)
+                if tuple(tokens[i:end]) == words and doc_ids[i] == doc_ids[end - 1]:
+                    hits.append((doc_ids[i], row))
+        return hits
+
+    def encode(self, texts):
+        """Category vectors for a batch of texts, as CSR arrays.
+
+        Returns (indptr, columns, weights): text i has non-zero weights
+        weights[indptr[i]:indptr[i + 1]] in the categories at the same
+        positions of `columns`. Each row has unit L2 norm (or is empty).
+        """
+        token_lists = [_WORD_RE.findall(text.lower()) for text in texts]
+        lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+        tokens = list(chain.from_iterable(token_lists))
+        doc_ids = np.repeat(np.arange(len(token_lists)), lengths)
+        resolved = np.array(list(map(self._resolve, tokens)), dtype=np.float64).reshape(-1, 2)
+        rows, scores = resolved[:, 0].astype(np.int64), resolved[:, 1]
+        if self._phrases:
+            hits = self._phrase_hits(tokens, doc_ids)
+            if hits:
+                extra = np.array(hits, dtype=np.int64)
+                doc_ids = np.concatenate([doc_ids, extra[:, 0]])
+                rows = np.concatenate([rows, extra[:, 1]])
+                scores = np.concatenate([scores, np.ones(len(hits))])
+        found = rows >= 0
+        doc_ids, rows, scores = doc_ids[found], rows[found], scores[found]
+
+        # Expand each matched row into its categories.
+        starts = self._indptr[rows]
+        counts = self._indptr[rows + 1] - starts
+        total = int(counts.sum())
+        firsts = np.repeat(np.cumsum(counts) - counts, counts)
+        positions = np.repeat(starts, counts) + np.arange(total) - firsts
+        columns = self._columns[positions].astype(np.int64)
+        weights = np.repeat(scores * self._row_weight[rows], counts)
+
+        # Sum weights per (text, category) and normalize each text.
+        n_categories = len(self.categories)
+        keys, inverse = np.unique(np.repeat(doc_ids, counts) * n_categories + columns,
+                                  return_inverse=True)
+        sums = np.bincount(inverse, weights=weights, minlength=len(keys)).astype(np.float64)
+        docs = keys // n_categories
+        norms = np.sqrt(np.bincount(docs, weights=sums * sums, minlength=len(texts)))
+        sums /= norms[docs]
+        indptr = np.searchsorted(docs, np.arange(len(texts) + 1))
+        return indptr, (keys % n_categories).astype(np.int32), sums.astype(np.float32)
+
+    def affect(self, texts):
+        """Category vectors for a batch of texts as {category: weight}, strongest first."""
+        indptr, columns, weights = self.encode(texts)
+        names = self.categories
+        vectors = []
+        for start, end in zip(indptr[:-1].tolist(), indptr[1:].tolist()):
+            order = np.argsort(-weights[start:end], kind="stable") + start
+            vectors.append({names[c]: float(w) for c, w in zip(columns[order].tolist(),
+                                                                 weights[order].tolist())})
+        return vectors
+
+    def cache_info(self):
+        return self._resolve.cache_info()
+
+
+@functools.lru_cache(maxsize=1)
+def default_lexicon():
+    """The lexicon over the built-in Class VI, compiled on first use."""
+    return AffectLexicon()
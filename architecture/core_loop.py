@@ -1,39 +1,172 @@
-
 # AETHERIUS AGI - Core Consciousness Loop
 # This is the central engine of the AGI, a cycle of perception, reflection, and action.
+#
+# Each turn runs as a pipeline of stages on an asyncio event loop. Blocking
+# stages run in worker threads, so independent stages overlap and many
+# conversations can be in flight in one process:
+#
+#   listen ─┬─ expand_input ─┬─ monologue → intuition → schedule → execute → compose → speak
+#           └─ memory_search ┘                                                           └─ update_memory (background)
+
+import asyncio
+import logging
+import os
+import secrets
+import sys
+import time
+
+if __name__ == "__main__":
+    # Run as a script, as scripts/launch.py would: put the repository root and
+    # the sibling packages that aetherius_logic imports from on the path.
+    _ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    for _path in ("", "memory", "llm_interface"):
+        sys.path.append(os.path.join(_ROOT, _path))
+
+from aetherius_logic import (
+    compose_response,
+    execute_subagents,
+    expand_input,
+    generate_inner_monologue,
+    generate_intuition,
+    listen,
+    memory_search,
+    schedule_tasks,
+    speak,
+    update_memory,
+)
+from tracing import NULL_TRACER
+
+logger = logging.getLogger("aetherius.core")
+
+EXIT_COMMANDS = {"exit", "quit"}
+
+
+class Session:
+    """Per-conversation state carried across turns.
+
+    New sessions get an unguessable id, since the id alone grants recall of
+    the session's memories.
+    """
+
+    def __init__(self, session_id=None):
+        self.session_id = session_id or secrets.token_urlsafe(16)
+        self.history = []
+
+
+class CoreLoopEngine:
+    """Runs conversation turns.
+
+    `speaker` receives the response (a string, or an iterator of tokens when
+    an LLM streams it) and returns the text it delivered. Memory recall is
+    limited to the turn's own session unless `shared_memory` is set.
+    """
+
+    def __init__(self, memory=None, executor=None, speaker=speak, tracer=NULL_TRACER, llm=None,
+                 shared_memory=False):
+        self.memory = memory
+        self.shared_memory = shared_memory
+        self.executor = executor
+        self.speaker = speaker
+        self.llm = llm
+        self.tracer = tracer
+        self._background = set()
+
+    async def run_turn(self, user_input, session=None):
+        """Runs one perception-to-speech cycle and returns the response."""
+        session = session or Session()
+        started = time.perf_counter()
+        filters = None if self.shared_memory else {"session": session.session_id}
+        with self.tracer.span("turn", "turn", session=session.session_id):
+            # 1-3. Expansion and memory retrieval are independent, so they overlap.
+            expanded, candidates = await asyncio.gather(
+                self._stage(expand_input, user_input),
+                self._stage(memory_search, {"text": user_input}, self.memory, filters),
+            )
+
+            # 4-8. Reasoning, planning, action and composition form the critical path.
+            monologue = await self._stage(
+                generate_inner_monologue, candidates, self.llm, user_input
+            )
+            plan = await self._stage(generate_intuition, monologue)
+            tasks = await self._stage(schedule_tasks, plan)
+            agent_results = await self._stage(execute_subagents, tasks, self.executor)
+            response = await self._stage(compose_response, monologue, agent_results, self.llm)
+
+            # 10. Speech streams out before the memory write, which runs in the background.
+            response = await self._stage(
+                self.speaker, self._first_token(response, started), name="speak"
+            )
+        session.history.append((user_input, response))
+        self._spawn(self._stage(
+            update_memory, expanded, monologue, response, self.memory,
+            {"session": session.session_id, "source": "conversation"},
+        ))
+        return response
+
+    def _first_token(self, response, started):
+        """Records the turn's time to first token as the speaker consumes it."""
+        if isinstance(response, str):
+            self.tracer.record("turn.first_token", "turn", started, time.perf_counter())
+            return response
 
-from aetherius_logic import *
+        def timed():
+            tokens = iter(response)
+            for token in tokens:
+                self.tracer.record("turn.first_token", "turn", started, time.perf_counter())
+                yield token
+                break
+            yield from tokens
 
-while True:
-    # 1. Perception: Listen for user input
-    user_input = listen()
+        return timed()
 
-    # 2. Expansion: Expand the input into a richer representation
-    expanded = expand_input(user_input)
+    def _stage(self, stage, *args, name=None):
+        """Runs a blocking stage in a worker thread inside a tracing span."""
+        def traced():
+            with self.tracer.span(name or stage.__name__):
+                return stage(*args)
+        return asyncio.to_thread(traced)
 
-    # 3. Memory Retrieval: Search memory for relevant candidates
-    candidates = memory_search(expanded)
+    def _spawn(self, coroutine):
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        task.add_done_callback(self._report_failure)
 
-    # 4. Inner Monologue: Generate an internal dialogue to reason about the situation
-    monologue = generate_inner_monologue(candidates)
+    @staticmethod
+    def _report_failure(task):
+        # Nobody awaits background writes, so a failure must be logged here.
+        if not task.cancelled() and task.exception() is not None:
+            logger.exception("Background task failed", exc_info=task.exception())
 
-    # 5. Intuition & Planning: Formulate a plan of action
-    plan = generate_intuition(monologue)
+    async def drain(self):
+        """Waits for background memory writes to finish."""
+        while self._background:
+            await asyncio.gather(*list(self._background), return_exceptions=True)
 
-    # 6. Task Scheduling: Break the plan down into executable tasks
-    tasks = schedule_tasks(plan)
+    async def interactive(self, session=None):
+        """Runs turns from stdin until EOF or an exit command."""
+        session = session or Session()
+        try:
+            while True:
+                try:
+                    user_input = await asyncio.to_thread(listen)
+                except EOFError:
+                    break
+                if user_input.strip().lower() in EXIT_COMMANDS:
+                    break
+                await self.run_turn(user_input, session)
+        finally:
+            await self.drain()
 
-    # 7. Action: Execute tasks via sub-agents
-    agent_results = execute_subagents(tasks)
 
-    # 8. Response Composition: Formulate a response based on the internal monologue and agent results
-    response = compose_response(monologue, agent_results)
+def core_loop(memory=None, executor=None, tracer=NULL_TRACER, llm=None):
+    """Blocking entry point: converse on stdin/stdout until the user exits.
 
-    # 9. Memory Update: Update memory with the new experience
-    update_memory(expanded, monologue, response)
+    The console has a single user, so every earlier conversation is recalled.
+    """
+    engine = CoreLoopEngine(memory, executor, tracer=tracer, llm=llm, shared_memory=True)
+    asyncio.run(engine.interactive())
 
-    # 10. Speech: Deliver the response to the user
-    speak(response)
 
-    # Break the loop for testing purposes
-    break
+if __name__ == "__main__":
+    core_loop()
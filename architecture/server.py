@@ -0,0 +1,267 @@
+# AETHERIUS AGI - Core Loop Server
+# Serves conversation turns for many sessions over HTTP.
+#
+#   POST /v1/turn   {"input": "...", "session_id": "..."}  ->  {"session_id", "response"}
+#   GET  /healthz   liveness, queue depth and in-flight turns
+#   GET  /stats     counters plus per-stage latency from the tracer
+#
+# Accepted turns wait in a bounded admission queue served by a fixed number of
+# workers. When the queue is full the server answers 429 straight away instead
+# of letting latency grow without bound. Turns of one session run in order;
+# different sessions run concurrently. On shutdown the listener closes, new
+# turns get 503, and queued and in-flight turns finish before the process exits.
+# Each session only recalls its own memories unless `shared_memory` is set.
+# Session ids are issued by the server: a turn without "session_id" starts a
+# new session, and an id the server did not issue (or has expired) gets 404.
+
+import asyncio
+import json
+import logging
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from affect_lexicon import default_lexicon
+from core_loop import CoreLoopEngine, Session
+from tracing import NULL_TRACER
+
+logger = logging.getLogger("aetherius.server")
+
+MAX_BODY_BYTES = 1 << 20
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+SESSION_SWEEP_INTERVAL = 60.0
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def collect_text(response):
+    """Speaker for server turns: returns the response instead of printing it."""
+    return response if isinstance(response, str) else "".join(response)
+
+
+async def read_request(reader):
+    """Parses one HTTP/1.1 request; returns None when the client closed the connection."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+    return method, path.split("?", 1)[0], body, keep_alive
+
+
+def write_response(writer, status, payload, keep_alive=True, headers=None):
+    body = json.dumps(payload).encode("utf-8")
+    head = [
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    head += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+
+class CoreLoopServer:
+    def __init__(self, memory=None, executor=None, llm=None, tracer=NULL_TRACER,
+                 host="127.0.0.1", port=8080, workers=16, max_queue=64, session_ttl=3600.0,
+                 shared_memory=False):
+        self.engine = CoreLoopEngine(
+            memory, executor, speaker=collect_text, tracer=tracer, llm=llm,
+            shared_memory=shared_memory,
+        )
+        self.tracer = tracer
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_queue = max_queue
+        self.session_ttl = session_ttl
+        self.sessions = {}
+        self.turns = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self._queue = None
+        self._server = None
+        self._worker_tasks = []
+        self._draining = False
+        self._stopped = None
+        self._next_sweep = 0.0
+
+    async def start(self):
+        # Stages run via asyncio.to_thread and can block on the LLM for a whole
+        # turn, so the default pool (cpu_count + 4 threads) would cap concurrency.
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(self.workers * 2, thread_name_prefix="aetherius-stage")
+        )
+        # Compile the affect lexicon now rather than on the first turn.
+        await asyncio.to_thread(default_lexicon)
+        self._queue = asyncio.Queue(self.max_queue)
+        self._stopped = asyncio.Event()
+        self._worker_tasks = [
+            asyncio.create_task(self._work()) for _ in range(self.workers)
+        ]
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Serving on http://%s:%d", self.host, self.port)
+        return self
+
+    async def serve_forever(self):
+        """Runs until SIGINT/SIGTERM, then shuts down gracefully."""
+        await self.start()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, lambda: asyncio.create_task(self.shutdown()))
+        await self._stopped.wait()
+
+    async def shutdown(self, timeout=30.0):
+        """Stops accepting turns and waits up to `timeout` for queued ones to finish."""
+        if self._draining:
+            return
+        self._draining = True
+        logger.info("Draining %d queued turns...", self._queue.qsize())
+        self._server.close()
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Shutdown timed out with %d turns queued.", self._queue.qsize())
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        await self.engine.drain()
+        await self._server.wait_closed()
+        self._stopped.set()
+
+    def _session(self, session_id):
+        """Returns [session, lock, last_used] for `session_id`, or a new session if None."""
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._expire_sessions(now)
+            self._next_sweep = now + SESSION_SWEEP_INTERVAL
+        if session_id is None:
+            session = Session()
+            state = self.sessions[session.session_id] = [session, asyncio.Lock(), now]
+        else:
+            state = self.sessions.get(session_id)
+            if state is None:
+                raise HTTPError(404, "Unknown or expired session")
+        state[2] = now
+        return state
+
+    def _expire_sessions(self, now):
+        for session_id, (_, lock, last_used) in list(self.sessions.items()):
+            if now - last_used > self.session_ttl and not lock.locked():
+                del self.sessions[session_id]
+
+    async def _work(self):
+        while True:
+            user_input, state, future = await self._queue.get()
+            session, lock, _ = state
+            self.in_flight += 1
+            try:
+                async with lock:
+                    response = await self.engine.run_turn(user_input, session)
+                self.turns += 1
+                if not future.done():
+                    future.set_result(response)
+            except Exception as exc:
+                logger.exception("Turn failed for %s", session.session_id)
+                if not future.done():
+                    future.set_exception(exc)
+            finally:
+                self.in_flight -= 1
+                self._queue.task_done()
+
+    async def _turn(self, body):
+        if self._draining:
+            raise HTTPError(503, "Server is shutting down")
+        try:
+            request = json.loads(body or b"{}")
+            user_input = request["input"]
+            session_id = request.get("session_id")
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise HTTPError(400, 'Expected a JSON body with an "input" field')
+        if not isinstance(user_input, str):
+            raise HTTPError(400, '"input" must be a string')
+        if session_id is not None and not isinstance(session_id, str):
+            raise HTTPError(400, '"session_id" must be a string')
+        state = self._session(session_id)
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((user_input, state, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise HTTPError(429, "Admission queue is full")
+        response = await future
+        return {"session_id": state[0].session_id, "response": response}
+
+    def stats(self):
+        return {
+            "turns": self.turns,
+            "rejected": self.rejected,
+            "queued": self._queue.qsize(),
+            "in_flight": self.in_flight,
+            "sessions": len(self.sessions),
+            "stages": self.tracer.stats(),
+        }
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                keep_alive = True
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    method, path, body, keep_alive = request
+                    if path == "/v1/turn":
+                        if method != "POST":
+                            raise HTTPError(405, "Use POST")
+                        payload = await self._turn(body)
+                    elif path == "/healthz":
+                        payload = {
+                            "status": "draining" if self._draining else "ok",
+                            "queued": self._queue.qsize(),
+                            "in_flight": self.in_flight,
+                        }
+                    elif path == "/stats":
+                        payload = self.stats()
+                    else:
+                        raise HTTPError(404, f"No route for {path}")
+                    write_response(writer, 200, payload, keep_alive)
+                except HTTPError as exc:
+                    keep_alive = (
+                        keep_alive and exc.status in (404, 405, 429) and not self._draining
+                    )
+                    headers = {"Retry-After": "1"} if exc.status in (429, 503) else None
+                    write_response(writer, exc.status, {"error": str(exc)}, keep_alive, headers)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception:
+            logger.exception("Request failed")
+            write_response(writer, 500, {"error": "Internal server error"}, keep_alive=False)
+        finally:
+            writer.close()
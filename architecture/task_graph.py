@@ -0,0 +1,186 @@
+# AETHERIUS AGI - Task Graph Scheduler
+# Runs plans as dependency graphs, releasing each task as soon as its inputs exist.
+#
+# A task is {"task_name", "agent", "params", "inputs", "outputs"}. Each name in
+# "outputs" is bound to the task's result; each name in "inputs" must be the
+# output of another task in the plan. A param value written as "$name" is
+# replaced by that output before the task is dispatched.
+
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+class TaskGraph:
+    def __init__(self, tasks):
+        self.tasks = []
+        self.aliases = {}
+        self._dedupe(tasks)
+        self.producers = {}
+        for task in self.tasks:
+            for name in task.get("outputs", []):
+                if name in self.producers:
+                    raise ValueError(f"Output '{name}' is produced by more than one task")
+                self.producers[name] = task["task_name"]
+        self.dependencies = {
+            task["task_name"]: sorted({self._producer(name) for name in task.get("inputs", [])})
+            for task in self.tasks
+        }
+        self.dependents = {task["task_name"]: [] for task in self.tasks}
+        for name, dependencies in self.dependencies.items():
+            for dependency in dependencies:
+                self.dependents[dependency].append(name)
+        self.order = self._topological_order()
+
+    def _dedupe(self, tasks):
+        """Collapses identical sub-tasks (same agent, params and inputs) into one."""
+        canonical = {}
+        for task in tasks:
+            key = json.dumps(
+                [task.get("agent"), task.get("params", {}), sorted(task.get("inputs", []))],
+                sort_keys=True, default=str,
+            )
+            original = canonical.get(key)
+            if original is None:
+                canonical[key] = task = dict(task, outputs=list(task.get("outputs", [])))
+                self.tasks.append(task)
+                self.aliases[task["task_name"]] = task["task_name"]
+                continue
+            # The duplicate's outputs become extra names for the original's result.
+            original["outputs"].extend(task.get("outputs", []))
+            self.aliases[task["task_name"]] = original["task_name"]
+
+    def _producer(self, name):
+        if name not in self.producers:
+            raise ValueError(f"No task produces input '{name}'")
+        return self.producers[name]
+
+    def _topological_order(self):
+        remaining = {name: len(deps) for name, deps in self.dependencies.items()}
+        ready = [task["task_name"] for task in self.tasks if not remaining[task["task_name"]]]
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for dependent in self.dependents[name]:
+                remaining[dependent] -= 1
+                if not remaining[dependent]:
+                    ready.append(dependent)
+        if len(order) != len(self.tasks):
+            raise ValueError("Task plan contains a dependency cycle")
+        return order
+
+    def critical_path(self, durations):
+        """Longest chain of dependent tasks under `durations` (task name -> seconds)."""
+        finish = {}
+        previous = {}
+        for name in self.order:
+            start = 0.0
+            for dependency in self.dependencies[name]:
+                if finish[dependency] > start:
+                    start = finish[dependency]
+                    previous[name] = dependency
+            finish[name] = start + durations.get(name, 0.0)
+        if not finish:
+            return [], 0.0
+        name = max(finish, key=finish.get)
+        total = finish[name]
+        path = [name]
+        while name in previous:
+            name = previous[name]
+            path.append(name)
+        return path[::-1], total
+
+
+class DagScheduler:
+    """Runs a TaskGraph on a TaskExecutor with maximal parallelism."""
+
+    def __init__(self, executor, default_timeout=None):
+        self.executor = executor
+        self.default_timeout = default_timeout
+
+    def run(self, tasks):
+        """Runs every task once its dependencies finish.
+
+        Returns {"results", "critical_path", "critical_path_seconds",
+        "makespan"}; "results" has one record per input task, in input order.
+        A deduplicated task gets a copy of its original's record under its own
+        "task_name". A task whose
+        dependency did not succeed is reported as "skipped".
+        """
+        graph = tasks if isinstance(tasks, TaskGraph) else TaskGraph(tasks)
+        by_name = {task["task_name"]: task for task in graph.tasks}
+        waiting = {name: len(deps) for name, deps in graph.dependencies.items()}
+        values = {}
+        records = {}
+        running = {}
+        started_at = {}
+        durations = {}
+        began = time.monotonic()
+
+        def release(name):
+            task = by_name[name]
+            params = {key: _resolve(value, values) for key, value in task.get("params", {}).items()}
+            started_at[name] = time.monotonic()
+            running[self.executor.submit(dict(task, params=params))] = name
+
+        def settle(name, record):
+            records[name] = dict(record, task_name=name, agent=by_name[name].get("agent"))
+            durations[name] = time.monotonic() - started_at[name] if name in started_at else 0.0
+            records[name]["duration"] = durations[name]
+            if record["status"] == "ok":
+                for output in by_name[name].get("outputs", []):
+                    values[output] = record["result"]
+            for dependent in graph.dependents[name]:
+                if record["status"] != "ok":
+                    if dependent not in records:
+                        error = f"Dependency '{name}' did not succeed"
+                        settle(dependent, {"status": "skipped", "error": error})
+                    continue
+                waiting[dependent] -= 1
+                if not waiting[dependent] and dependent not in records:
+                    release(dependent)
+
+        for name in graph.order:
+            if not waiting[name]:
+                release(name)
+        while running:
+            deadlines = {
+                future: started_at[name] + by_name[name].get("timeout", self.default_timeout)
+                for future, name in running.items()
+                if by_name[name].get("timeout", self.default_timeout) is not None
+            }
+            timeout = None
+            if deadlines:
+                timeout = max(0.0, min(deadlines.values()) - time.monotonic())
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    record = {"status": "ok", "result": future.result()}
+                except Exception as exc:
+                    record = {"status": "error", "error": f"{type(exc).__name__}: {exc}"}
+                settle(name, record)
+            now = time.monotonic()
+            for future, deadline in deadlines.items():
+                if future in running and deadline <= now:
+                    name = running.pop(future)
+                    future.cancel()
+                    settle(name, {"status": "timeout", "error": "Task exceeded its timeout"})
+
+        path, path_seconds = graph.critical_path(durations)
+        return {
+            "results": [
+                dict(records[original], task_name=name) for name, original in graph.aliases.items()
+            ],
+            "critical_path": path,
+            "critical_path_seconds": path_seconds,
+            "makespan": time.monotonic() - began,
+        }
+
+
+def _resolve(value, values):
+    """Substitutes a "$output" reference with the value it names."""
+    if isinstance(value, str) and value.startswith("$") and value[1:] in values:
+        return values[value[1:]]
+    return value
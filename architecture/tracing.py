@@ -0,0 +1,153 @@
+# AETHERIUS AGI - Tracing
+# Lightweight spans and rolling latency histograms for the core loop.
+#
+# Components take an optional tracer and wrap their work in `tracer.span(...)`.
+# A disabled tracer hands back one shared no-op span, so instrumentation costs
+# a method call and an attribute check. Spans export as plain JSON or in the
+# Chrome trace-event format (load the file in chrome://tracing or Perfetto).
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "category", "attrs", "start")
+
+    def __init__(self, tracer, name, category, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer.record(self.name, self.category, self.start, time.perf_counter(), self.attrs)
+        return False
+
+    def set(self, **attrs):
+        """Attaches attributes discovered while the span is open."""
+        self.attrs.update(attrs)
+
+
+class LatencyHistogram:
+    """Rolling window of recent durations with percentile summaries."""
+
+    def __init__(self, window=2048):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentiles(self, *qs):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return [0.0 for _ in qs]
+        return [ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))] for q in qs]
+
+    def summary(self):
+        p50, p95, p99 = self.percentiles(50, 95, 99)
+        return {"count": self.count, "p50": p50, "p95": p95, "p99": p99}
+
+
+class Tracer:
+    def __init__(self, enabled=True, max_spans=100000, histogram_window=2048):
+        self.enabled = enabled
+        self.histogram_window = histogram_window
+        self.spans = deque(maxlen=max_spans)
+        self.histograms = {}
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def span(self, name, category="stage", **attrs):
+        """Context manager timing one unit of work."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, attrs)
+
+    def record(self, name, category, start, end, attrs=None):
+        """Records a span from perf_counter() timestamps taken elsewhere."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.spans.append((name, category, start, end, threading.get_ident(), attrs or {}))
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram(self.histogram_window)
+            histogram.add(end - start)
+
+    def stats(self):
+        """{span name: {"count", "p50", "p95", "p99"}} in seconds."""
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in self.histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.histograms.clear()
+
+    def to_json(self):
+        with self._lock:
+            spans = list(self.spans)
+        return [
+            {
+                "name": name,
+                "category": category,
+                "start": start - self._origin,
+                "duration": end - start,
+                "thread": thread,
+                "attrs": attrs,
+            }
+            for name, category, start, end, thread, attrs in spans
+        ]
+
+    def to_chrome_trace(self):
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": span["name"],
+                    "cat": span["category"],
+                    "ph": "X",
+                    "ts": span["start"] * 1e6,
+                    "dur": span["duration"] * 1e6,
+                    "pid": pid,
+                    "tid": span["thread"],
+                    "args": span["attrs"],
+                }
+                for span in self.to_json()
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def export(self, path, chrome=True):
+        """Writes spans to `path` as a Chrome trace (default) or plain JSON."""
+        payload = self.to_chrome_trace() if chrome else {"spans": self.to_json(), "stats": self.stats()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, default=str)
+
+
+NULL_TRACER = Tracer(enabled=False)
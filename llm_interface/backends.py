@@ -0,0 +1,303 @@
+# AETHERIUS AGI - LLM Backends
+# Pluggable transports behind LLMConnector.
+#
+# Every backend exposes `async generate(prompt, **params) -> str`,
+# `async generate_batch(prompts, **params) -> [str]` and
+# `astream(prompt, **params)`, an async iterator of text chunks. The HTTP
+# backend speaks a minimal JSON protocol:
+#   POST {path}  {"model": ..., "prompt": ..., **params}     ->  {"text": ...}
+#   POST {path}  {"model": ..., "prompts": [...], **params}  ->  {"texts": [...]}
+# With "stream": true the reply is chunked, one {"text": chunk} JSON per line.
+# MockLLMServer serves the same protocol in-process for tests and benchmarks.
+
+import asyncio
+import http.client
+import json
+import queue
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Sentinel closing a chunk queue.
+END_OF_STREAM = object()
+
+
+class BackendError(Exception):
+    """A failed backend call; `retryable` marks transient failures."""
+
+    def __init__(self, message, status=None, retryable=False):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+
+def split_tokens(text):
+    """Splits text into word-sized chunks that concatenate back to it."""
+    return re.findall(r"\s*\S+", text) or [text]
+
+
+class SimulatedBackend:
+    """Deterministic stand-in used when no real model is configured.
+
+    `latency` is the delay before the first token, `token_delay` the delay
+    between streamed tokens.
+    """
+
+    def __init__(self, latency=0.0, token_delay=0.0):
+        self.latency = latency
+        self.token_delay = token_delay
+
+    def _respond(self, prompt):
+        return f"This is a simulated LLM response to the prompt: '{prompt}'"
+
+    async def generate(self, prompt, model=None, **params):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        text = self._respond(prompt)
+        if self.token_delay:
+            await asyncio.sleep(self.token_delay * (len(split_tokens(text)) - 1))
+        return text
+
+    async def generate_batch(self, prompts, model=None, **params):
+        # A batch costs about as much as one request; that is the point.
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self._respond(prompt) for prompt in prompts]
+
+    async def astream(self, prompt, model=None, **params):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for i, token in enumerate(split_tokens(self._respond(prompt))):
+            if i and self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield token
+
+    async def aclose(self):
+        pass
+
+
+class HTTPBackend:
+    """JSON-over-HTTP backend with a pool of keep-alive connections.
+
+    Up to `pool_size` requests are in flight at once, each on its own
+    persistent connection and worker thread, so concurrent callers never
+    queue behind one socket. Connections that error are discarded.
+    """
+
+    def __init__(self, base_url, path="/v1/generate", pool_size=8, timeout=30.0,
+                 api_key=None):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+        self._idle = queue.LifoQueue()
+        self._workers = ThreadPoolExecutor(pool_size, thread_name_prefix="aetherius-llm-http")
+
+    def _connect(self):
+        connection_class = (
+            http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        )
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _checkin(self, connection, response):
+        if response.will_close:
+            connection.close()
+        else:
+            self._idle.put(connection)
+
+    def _open(self, connection, body):
+        try:
+            connection.request("POST", self.path, body=body, headers=self.headers)
+            response = connection.getresponse()
+            if response.status >= 400:
+                payload = response.read()
+        except (OSError, http.client.HTTPException) as exc:
+            connection.close()
+            raise BackendError(f"{type(exc).__name__}: {exc}", retryable=True) from exc
+        if response.status >= 400:
+            self._checkin(connection, response)
+            retryable = response.status == 429 or response.status >= 500
+            raise BackendError(
+                f"HTTP {response.status}: {payload[:200]!r}", response.status, retryable
+            )
+        return response
+
+    def _request(self, body, field="text"):
+        connection = self._checkout()
+        response = self._open(connection, body)
+        try:
+            payload = response.read()
+        except (OSError, http.client.HTTPException) as exc:
+            connection.close()
+            raise BackendError(f"{type(exc).__name__}: {exc}", retryable=True) from exc
+        self._checkin(connection, response)
+        return json.loads(payload)[field]
+
+    def _stream_request(self, body, emit, stop):
+        connection = self._checkout()
+        response = self._open(connection, body)
+        try:
+            for line in response:
+                if stop.is_set():
+                    # The reader went away; drop the half-read connection.
+                    connection.close()
+                    return
+                if line.strip():
+                    emit(json.loads(line)["text"])
+        except (OSError, http.client.HTTPException) as exc:
+            connection.close()
+            raise BackendError(f"{type(exc).__name__}: {exc}", retryable=True) from exc
+        self._checkin(connection, response)
+
+    async def generate(self, prompt, model=None, **params):
+        body = json.dumps({"model": model, "prompt": prompt, **params}).encode("utf-8")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._workers, self._request, body)
+
+    async def generate_batch(self, prompts, model=None, **params):
+        body = json.dumps({"model": model, "prompts": list(prompts), **params}).encode("utf-8")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._workers, self._request, body, "texts")
+
+    async def astream(self, prompt, model=None, **params):
+        body = json.dumps(
+            {"model": model, "prompt": prompt, **params, "stream": True}
+        ).encode("utf-8")
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue()
+        stop = threading.Event()
+
+        def emit(chunk):
+            loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+
+        future = loop.run_in_executor(self._workers, self._stream_request, body, emit, stop)
+        # Queued after every emit() from the worker, so it arrives last.
+        future.add_done_callback(lambda _: chunks.put_nowait(END_OF_STREAM))
+        try:
+            while (chunk := await chunks.get()) is not END_OF_STREAM:
+                yield chunk
+            await future
+        finally:
+            stop.set()
+
+    async def aclose(self):
+        self._workers.shutdown(wait=False)
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class MockLLMServer:
+    """In-process HTTP server speaking the HTTPBackend protocol.
+
+    `latency` delays every response, `token_delay` paces streamed tokens,
+    and `failure_rate` answers that fraction of requests with HTTP 503 to
+    exercise retries.
+
+        with MockLLMServer(latency=0.05) as server:
+            backend = HTTPBackend(server.url)
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, token_delay=0.0,
+                 failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; with Nagle on, the
+            # body waits for the client's delayed ACK (~40 ms per request).
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server._lock:
+                    server.requests += 1
+                    fail = server._random.random() < server.failure_rate
+                if server.latency:
+                    time.sleep(server.latency)
+                if fail:
+                    self._reply(503, {"error": "overloaded"})
+                elif "prompts" in request:
+                    texts = [
+                        server.respond(dict(request, prompt=prompt)) for prompt in request["prompts"]
+                    ]
+                    self._reply(200, {"texts": texts})
+                elif request.get("stream"):
+                    self._stream(split_tokens(server.respond(request)))
+                else:
+                    self._reply(200, {"text": server.respond(request)})
+
+            def _stream(self, tokens):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i, token in enumerate(tokens):
+                    if i and server.token_delay:
+                        time.sleep(server.token_delay)
+                    line = json.dumps({"text": token}).encode("utf-8") + b"\n"
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def respond(self, request):
+        return f"Mock response from {request.get('model')} to: {request.get('prompt')}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,116 @@
+# AETHERIUS AGI - Micro-batching
+# Coalesces concurrent single-item calls into batched backend calls.
+#
+# Callers submit one item and get a future. A collector thread waits until
+# `max_batch_size` items are queued or the oldest has waited `max_delay`
+# seconds, then hands the whole batch to `batch_fn` on a small worker pool and
+# fans the results back out. Under light load a call pays at most `max_delay`
+# extra; under heavy load one backend call serves many callers.
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class MicroBatcher:
+    """Batches calls to `batch_fn(items) -> results` (one result per item).
+
+    `max_in_flight` batches may run at once, so a slow batch does not hold
+    back the next one. If `batch_fn` raises, every caller in the batch gets
+    the exception.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=32, max_delay=0.005, max_in_flight=1,
+                 name="batch", window=2048):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.name = name
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._workers = ThreadPoolExecutor(max_in_flight, thread_name_prefix=f"aetherius-{name}")
+        self.batches = 0
+        self.items = 0
+        self._sizes = deque(maxlen=window)
+        self._delays = deque(maxlen=window)
+        self._collector = threading.Thread(
+            target=self._collect, name=f"aetherius-{name}-collector", daemon=True
+        )
+        self._collector.start()
+
+    def submit(self, item):
+        """Queues `item` and returns a Future for its result."""
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError(f"{self.name} batcher is closed")
+            self._pending.append((item, future, time.monotonic()))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch_size:
+                self._condition.notify()
+        return future
+
+    def call(self, item):
+        """Blocks until `item`'s batch has run and returns its result."""
+        return self.submit(item).result()
+
+    def _collect(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                deadline = self._pending[0][2] + self.max_delay
+                while len(self._pending) < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                count = min(len(self._pending), self.max_batch_size)
+                batch = [self._pending.popleft() for _ in range(count)]
+            dispatched = time.monotonic()
+            self.batches += 1
+            self.items += count
+            self._sizes.append(count)
+            self._delays.extend(dispatched - queued for _, _, queued in batch)
+            self._workers.submit(self._run, batch)
+
+    def _run(self, batch):
+        try:
+            results = self.batch_fn([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"{self.name}: expected {len(batch)} results, got {len(results)}")
+        except BaseException as exc:
+            for _, future, _ in batch:
+                future.set_exception(exc)
+            return
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self):
+        """Batch sizes and the queueing delay (seconds) added before dispatch."""
+        sizes = sorted(self._sizes)
+        delays = sorted(self._delays)
+
+        def percentile(ordered, q):
+            return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))] if ordered else 0.0
+
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "p50_batch_size": percentile(sizes, 50),
+            "max_batch_size": sizes[-1] if sizes else 0,
+            "p50_queue_delay": percentile(delays, 50),
+            "p95_queue_delay": percentile(delays, 95),
+        }
+
+    def close(self):
+        """Flushes queued items, then stops the collector and workers."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._collector.join()
+        self._workers.shutdown(wait=True)
@@ -1,22 +1,283 @@
-
-
 # AETHERIUS AGI - LLM Interface
 # Connects to a Large Language Model to generate text.
+#
+# Requests from every caller are funnelled onto one connector-owned event
+# loop, where a concurrency semaphore and a token bucket are shared by all of
+# them. Coroutine callers use `await agenerate(...)` or `async for` over
+# `astream(...)`; blocking callers (stages running in worker threads) use
+# `generate_response(...)` or iterate `stream(...)`. Transient backend failures
+# are retried with full-jitter exponential backoff; a stream is only retried
+# if it failed before its first token. With a ResponseCache, cached prompts are
+# answered without reaching the backend at all. With `batch_window`, concurrent
+# non-streaming requests are coalesced into `generate_batch` calls.
+
+import asyncio
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from contextlib import nullcontext
+
+from backends import END_OF_STREAM, BackendError, SimulatedBackend
+from batching import MicroBatcher
+
+logger = logging.getLogger("aetherius.llm")
+
+
+class TokenBucket:
+    """Admits `rate` requests per second on average, with bursts up to `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
 
 class LLMConnector:
-    def __init__(self, model_name="simulated_llm"):
+    def __init__(self, model_name="simulated_llm", backend=None, max_concurrency=8,
+                 rate_limit=None, burst=None, max_retries=3, backoff_base=0.1,
+                 backoff_max=5.0, cache=None, batch_window=None, max_batch_size=16,
+                 tracer=None):
         self.model_name = model_name
-        print(f"INFO: Initialized LLM Connector with model: {self.model_name}")
+        self.backend = backend or SimulatedBackend()
+        self.max_concurrency = max_concurrency
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.cache = cache
+        self.batcher = None
+        if batch_window is not None:
+            self.batcher = MicroBatcher(
+                self._run_batch, max_batch_size, batch_window,
+                max_in_flight=max_concurrency, name="llm",
+            )
+        self.tracer = tracer
+        self.retries = 0
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        logger.info("Initialized LLM Connector with model: %s", self.model_name)
+
+    def _span(self, name):
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.span(name, "llm", model=self.model_name)
+
+    def _ensure_loop(self):
+        """Starts the connector's event loop thread on first use."""
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                # Created here, so both are bound to the connector's loop.
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._bucket = TokenBucket(self.rate_limit, self.burst) if self.rate_limit else None
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="aetherius-llm", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def _submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop())
+
+    async def _call(self, attempt_once, may_retry=lambda: True):
+        """Runs `attempt_once()` under the shared limits, retrying transient failures."""
+        attempt = 0
+        while True:
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            try:
+                async with self._semaphore:
+                    return await attempt_once()
+            except (BackendError, OSError, asyncio.TimeoutError) as exc:
+                retryable = getattr(exc, "retryable", True)
+                if not retryable or attempt >= self.max_retries or not may_retry():
+                    raise
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                attempt += 1
+                self.retries += 1
+                logger.warning(
+                    "LLM request failed (%s); retry %d/%d in %.2fs",
+                    exc, attempt, self.max_retries, delay,
+                )
+                await asyncio.sleep(delay)
+
+    async def _generate(self, prompt, params):
+        with self._span("llm.generate"):
+            return await self._call(
+                lambda: self.backend.generate(prompt, model=self.model_name, **params)
+            )
+
+    async def _generate_batch(self, prompts, params):
+        with self._span("llm.generate_batch") as span:
+            if span is not None:
+                span.set(batch_size=len(prompts))
+            return await self._call(
+                lambda: self.backend.generate_batch(prompts, model=self.model_name, **params)
+            )
 
-    def generate_response(self, prompt):
+    def _run_batch(self, items):
+        """MicroBatcher callback: one backend call per distinct set of params."""
+        groups = {}
+        for i, (prompt, params) in enumerate(items):
+            groups.setdefault(json.dumps(params, sort_keys=True, default=str), []).append(i)
+        futures = [
+            (rows, self._submit(self._generate_batch([items[i][0] for i in rows], items[rows[0]][1])))
+            for rows in groups.values()
+        ]
+        results = [None] * len(items)
+        for rows, future in futures:
+            for i, response in zip(rows, future.result()):
+                results[i] = response
+        return results
+
+    def _dispatch(self, prompt, params):
+        """Returns a concurrent Future for one non-streaming request."""
+        if self.batcher is not None:
+            return self.batcher.submit((prompt, params))
+        return self._submit(self._generate(prompt, params))
+
+    async def _stream(self, prompt, params, emit):
+        """Feeds chunks to `emit`, then END_OF_STREAM; records time to first token."""
+        started = time.perf_counter()
+        emitted = False
+
+        async def attempt_once():
+            nonlocal emitted
+            async for chunk in self.backend.astream(prompt, model=self.model_name, **params):
+                if not emitted:
+                    emitted = True
+                    if self.tracer is not None:
+                        self.tracer.record(
+                            "llm.first_token", "llm", started, time.perf_counter(),
+                            {"model": self.model_name},
+                        )
+                emit(chunk)
+
+        try:
+            with self._span("llm.stream"):
+                await self._call(attempt_once, lambda: not emitted)
+        finally:
+            emit(END_OF_STREAM)
+
+    def _cached(self, prompt, params):
+        if self.cache is None:
+            return None
+        response = self.cache.get(self.model_name, prompt, params)
+        if response is not None:
+            logger.info("Response cache hit for prompt: %.50s...", prompt)
+        return response
+
+    def _remember(self, prompt, params, response):
+        if self.cache is not None:
+            self.cache.put(self.model_name, prompt, response, params)
+
+    async def agenerate(self, prompt, **params):
+        """Generates a response without blocking the caller's event loop."""
+        logger.info("Generating response for prompt: %.50s...", prompt)
+        response = self._cached(prompt, params)
+        if response is None:
+            response = await asyncio.wrap_future(self._dispatch(prompt, params))
+            self._remember(prompt, params, response)
+        return response
+
+    def generate_response(self, prompt, **params):
         """Generates a response from the LLM based on a prompt."""
-        print(f"INFO: Generating response for prompt: {prompt[:50]}...")
-        # In a real implementation, this would make an API call to an LLM.
-        return f"This is a simulated LLM response to the prompt: '{prompt}'"
+        logger.info("Generating response for prompt: %.50s...", prompt)
+        response = self._cached(prompt, params)
+        if response is None:
+            response = self._dispatch(prompt, params).result()
+            self._remember(prompt, params, response)
+        return response
+
+    async def astream(self, prompt, **params):
+        """Yields response chunks as the backend produces them."""
+        logger.info("Streaming response for prompt: %.50s...", prompt)
+        cached = self._cached(prompt, params)
+        if cached is not None:
+            yield cached
+            return
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue()
+        future = self._submit(self._stream(
+            prompt, params, lambda chunk: loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+        ))
+        received = []
+        try:
+            while (chunk := await chunks.get()) is not END_OF_STREAM:
+                received.append(chunk)
+                yield chunk
+            await asyncio.wrap_future(future)
+            self._remember(prompt, params, "".join(received))
+        finally:
+            future.cancel()
+
+    def stream(self, prompt, **params):
+        """Starts a request now and returns a blocking iterator over its chunks."""
+        logger.info("Streaming response for prompt: %.50s...", prompt)
+        cached = self._cached(prompt, params)
+        if cached is not None:
+            return iter([cached])
+        chunks = queue.SimpleQueue()
+        future = self._submit(self._stream(prompt, params, chunks.put))
+
+        def iterate():
+            received = []
+            try:
+                while (chunk := chunks.get()) is not END_OF_STREAM:
+                    received.append(chunk)
+                    yield chunk
+                future.result()
+                self._remember(prompt, params, "".join(received))
+            finally:
+                future.cancel()
+
+        return iterate()
+
+    def stats(self):
+        """Retry count plus cache and batching metrics, where enabled."""
+        return {
+            "retries": self.retries,
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "batching": self.batcher.stats() if self.batcher is not None else None,
+        }
+
+    def close(self):
+        """Closes the backend and stops the connector's event loop."""
+        if self.batcher is not None:
+            self.batcher.close()
+        with self._start_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.backend.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+        loop.close()
 
 # Example Usage (for testing)
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
     llm = LLMConnector()
     response = llm.generate_response("What is the meaning of life?")
     print(f"\nLLM Response: {response}")
-
+    print("Streamed:", end="", flush=True)
+    for chunk in llm.stream("What is the meaning of life?"):
+        print(chunk, end="", flush=True)
+    print()
+    llm.close()
@@ -0,0 +1,122 @@
+# AETHERIUS AGI - Prompt Templates
+# Precompiled prompt templates and token-budgeted packing of retrieved memories.
+#
+# Templates use str.format-style `{field}` placeholders and are parsed once:
+# rendering is a join over precompiled literal and field parts. Retrieved
+# memories are packed into `{context}` highest score first until the token
+# budget is spent; the memory that crosses the budget is truncated rather than
+# dropped when enough room is left, so prompt size stays bounded as memory grows.
+
+import functools
+import re
+from string import Formatter
+
+# One token per word or punctuation mark, plus one per extra 4 characters
+# in long words: close to BPE counts for English at a fraction of the cost.
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text):
+    """Approximates the number of model tokens in `text`."""
+    tokens = _TOKEN_RE.findall(text)
+    return len(tokens) + sum((len(token) - 1) // 4 for token in tokens if len(token) > 8)
+
+
+def truncate_to_tokens(text, budget):
+    """Cuts `text` to at most `budget` tokens at a word boundary, marking the cut."""
+    if budget <= 0:
+        return ""
+    used = 0
+    for match in _TOKEN_RE.finditer(text):
+        token = match.group()
+        used += 1 + ((len(token) - 1) // 4 if len(token) > 8 else 0)
+        if used > budget - 1:  # leave room for the marker
+            return text[:match.start()].rstrip() + " …"
+    return text
+
+
+class PromptTemplate:
+    def __init__(self, source):
+        self.source = source
+        self._parts = []
+        for literal, field, spec, conversion in Formatter().parse(source):
+            if literal:
+                self._parts.append((literal, None))
+            if field is not None:
+                if spec or conversion or not field.isidentifier():
+                    raise ValueError(f"Unsupported placeholder '{{{field}}}' in template")
+                self._parts.append((None, field))
+        self.fields = [field for literal, field in self._parts if field is not None]
+        self.fixed_tokens = count_tokens("".join(literal or "" for literal, _ in self._parts))
+
+    def render(self, **values):
+        return "".join(
+            literal if field is None else str(values[field]) for literal, field in self._parts
+        )
+
+
+@functools.lru_cache(maxsize=256)
+def compile_template(source):
+    """Returns the compiled template for `source`, parsing it only once."""
+    return PromptTemplate(source)
+
+
+TEMPLATES = {
+    "inner_monologue": (
+        "You are AETHERIUS, reflecting before you act.\n"
+        "Relevant memories:\n{context}\n"
+        "User: {user_input}\n"
+        "Think step by step about what the user needs."
+    ),
+    "compose_response": (
+        "{monologue}\n"
+        "Task outcomes: {outcomes}\n"
+        "Respond to the user."
+    ),
+}
+
+
+def get_template(name):
+    return compile_template(TEMPLATES[name])
+
+
+def pack_memories(memories, budget, min_tokens=16, separator="\n"):
+    """Packs memories into at most `budget` tokens, highest score first.
+
+    `memories` are search results ({"text", "score", ...}). A memory that does
+    not fit whole is truncated if at least `min_tokens` remain, otherwise it
+    and everything after it are dropped. Returns (context, tokens_used,
+    memories_included).
+    """
+    lines = []
+    used = 0
+    separator_tokens = count_tokens(separator)
+    for memory in sorted(memories, key=lambda memory: memory.get("score", 0.0), reverse=True):
+        line = f"- {memory['text']}"
+        cost = count_tokens(line) + (separator_tokens if lines else 0)
+        if used + cost <= budget:
+            lines.append(line)
+            used += cost
+            continue
+        room = budget - used - (separator_tokens if lines else 0)
+        if room >= min_tokens:
+            line = truncate_to_tokens(line, room)
+            lines.append(line)
+            used += count_tokens(line) + (separator_tokens if len(lines) > 1 else 0)
+        break
+    return separator.join(lines), used, len(lines)
+
+
+def build_prompt(template, budget, memories=(), **values):
+    """Renders `template` with memories packed into `{context}` under `budget` tokens.
+
+    The budget covers the whole prompt, so the space left for context is
+    what the template text and the other values do not use.
+    """
+    if isinstance(template, str):
+        template = get_template(template) if template in TEMPLATES else compile_template(template)
+    if "context" not in template.fields:
+        return template.render(**values)
+    fixed = template.fixed_tokens + sum(count_tokens(str(value)) for value in values.values())
+    context, _, _ = pack_memories(memories, max(0, budget - fixed))
+    return template.render(context=context or "(none)", **values)
@@ -0,0 +1,164 @@
+# AETHERIUS AGI - Response Cache
+# Reuses LLM responses for repeated prompts instead of calling the model again.
+#
+# Exact lookups are keyed on (model, whitespace-normalised prompt, params) with
+# LRU and TTL eviction. An optional semantic tier embeds prompts in a dedicated
+# MemoryManager and serves a cached response when a new prompt for the same
+# model and params is within `semantic_threshold` cosine similarity.
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("aetherius.llm")
+
+FORMAT_VERSION = 1
+
+
+def normalize_prompt(prompt):
+    return " ".join(prompt.split())
+
+
+class ResponseCache:
+    """LRU/TTL cache of LLM responses with optional semantic matching.
+
+    `semantic` is a MemoryManager used only by this cache; give it a
+    RetentionPolicy so its index stays bounded too. Semantic matches resolve
+    to an exact entry, so evicted or expired responses are never served.
+    With `path`, entries are loaded on construction and written by save().
+    """
+
+    def __init__(self, max_entries=10000, ttl=None, path=None, semantic=None,
+                 semantic_threshold=0.95):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.semantic = semantic
+        self.semantic_threshold = semantic_threshold
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if path is not None and os.path.exists(path):
+            self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def params_key(params):
+        return json.dumps(params or {}, sort_keys=True, default=str)
+
+    @classmethod
+    def key(cls, model, prompt, params=None):
+        material = json.dumps([model, normalize_prompt(prompt), cls.params_key(params)])
+        return hashlib.blake2b(material.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _live(self, key, now):
+        """Returns the unexpired response under `key`, refreshing its LRU position."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        response, created_at, _ = entry
+        if self.ttl is not None and now - created_at > self.ttl:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def get(self, model, prompt, params=None):
+        """Returns a cached response for the prompt, or None on a miss."""
+        key = self.key(model, prompt, params)
+        now = time.time()
+        with self._lock:
+            response = self._live(key, now)
+            if response is not None:
+                self.hits += 1
+                return response
+        if self.semantic is not None:
+            matches = self.semantic.search_memory(
+                normalize_prompt(prompt), top_k=1,
+                filters={"model": model, "params": self.params_key(params)},
+            )
+            if matches and matches[0]["score"] >= self.semantic_threshold:
+                with self._lock:
+                    response = self._live(matches[0]["metadata"]["cache_key"], now)
+                    if response is not None:
+                        self.semantic_hits += 1
+                        return response
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, model, prompt, response, params=None):
+        if self.max_entries <= 0:
+            return
+        key = self.key(model, prompt, params)
+        with self._lock:
+            known = key in self._entries
+            self._entries[key] = (response, time.time(), model)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        if self.semantic is not None and not known:
+            self.semantic.store_memory(
+                normalize_prompt(prompt),
+                {"model": model, "params": self.params_key(params), "cache_key": key},
+            )
+
+    def invalidate(self, model=None):
+        """Drops every entry, or only `model`'s entries when given."""
+        with self._lock:
+            if model is None:
+                self._entries.clear()
+                return
+            for key in [key for key, entry in self._entries.items() if entry[2] == model]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def save(self):
+        """Atomically writes unexpired entries to `path`."""
+        if self.path is None:
+            return
+        now = time.time()
+        with self._lock:
+            entries = [
+                [key, response, created_at, model]
+                for key, (response, created_at, model) in self._entries.items()
+                if self.ttl is None or now - created_at <= self.ttl
+            ]
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": FORMAT_VERSION, "entries": entries}, f)
+        os.replace(tmp_path, self.path)
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != FORMAT_VERSION:
+            logger.warning("Ignoring response cache %s with unknown format.", self.path)
+            return
+        for key, response, created_at, model in payload["entries"][-self.max_entries:]:
+            self._entries[key] = (response, created_at, model)
@@ -0,0 +1,53 @@
+# AETHERIUS AGI - Embedding Cache
+# Bounded LRU cache of embeddings keyed by a hash of the text content.
+
+import hashlib
+from collections import OrderedDict
+
+
+class EmbeddingCache:
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(text):
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, text):
+        """Returns the cached embedding for `text`, or None on a miss."""
+        key = self.key(text)
+        vector = self._entries.get(key)
+        if vector is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return vector
+
+    def put(self, text, vector):
+        if self.max_entries <= 0:
+            return
+        vector.flags.writeable = False  # shared between callers
+        key = self.key(text)
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
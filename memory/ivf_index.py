@@ -0,0 +1,151 @@
+# AETHERIUS AGI - Approximate Vector Index
+# Inverted-file (IVF) index with a spherical k-means coarse quantizer.
+
+import numpy as np
+
+from vector_index import VectorIndex, top_k_indices
+
+
+class _IdList:
+    """Append-only int64 array that grows by doubling."""
+
+    def __init__(self, capacity=16):
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._size = 0
+
+    def extend(self, ids):
+        needed = self._size + len(ids)
+        if needed > self._ids.shape[0]:
+            capacity = self._ids.shape[0]
+            while capacity < needed:
+                capacity *= 2
+            grown = np.empty(capacity, dtype=np.int64)
+            grown[:self._size] = self._ids[:self._size]
+            self._ids = grown
+        self._ids[self._size:needed] = ids
+        self._size = needed
+
+    @property
+    def ids(self):
+        return self._ids[:self._size]
+
+    def renumber(self, keep, new_ids):
+        """Drops ids not set in the `keep` mask and maps the rest through `new_ids`."""
+        ids = self.ids[keep[self.ids]]
+        self._ids[:ids.shape[0]] = new_ids[ids]
+        self._size = ids.shape[0]
+
+
+def spherical_kmeans(vectors, n_clusters, iterations=10, seed=0):
+    """Clusters unit vectors by cosine similarity and returns unit centroids."""
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, vectors.shape[0])
+    centroids = vectors[rng.choice(vectors.shape[0], n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        counts = np.bincount(assignments, minlength=n_clusters)
+        # Re-seed empty clusters from random points so no list goes unused.
+        empty = np.flatnonzero(counts == 0)
+        if empty.size:
+            sums[empty] = vectors[rng.choice(vectors.shape[0], empty.size)]
+        centroids = VectorIndex.normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    """Approximate drop-in for VectorIndex.
+
+    Vectors are stored in an exact VectorIndex; once `train_size` vectors
+    have arrived, a k-means quantizer partitions them into `n_lists` inverted
+    lists and each query only scores the `n_probe` closest lists. Raising
+    `n_probe` trades latency for recall; `n_probe == n_lists` is exact.
+    Until trained, searches fall back to the exact scan.
+    """
+
+    def __init__(self, dim, n_lists=256, n_probe=8, train_size=None,
+                 kmeans_iterations=10, seed=0):
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_size = train_size or n_lists * 39
+        self.kmeans_iterations = kmeans_iterations
+        self.seed = seed
+        self.storage = VectorIndex(dim)
+        self.centroids = None
+        self._lists = []
+
+    def __len__(self):
+        return len(self.storage)
+
+    @property
+    def vectors(self):
+        return self.storage.vectors
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    def train(self, sample_size=None):
+        """(Re)fits the coarse quantizer and rebuilds every inverted list."""
+        vectors = self.storage.vectors
+        if vectors.shape[0] == 0:
+            return
+        sample = vectors
+        sample_size = sample_size or self.train_size
+        if vectors.shape[0] > sample_size:
+            rng = np.random.default_rng(self.seed)
+            sample = vectors[rng.choice(vectors.shape[0], sample_size, replace=False)]
+        self.centroids = spherical_kmeans(
+            sample, self.n_lists, self.kmeans_iterations, self.seed
+        )
+        self._lists = [_IdList() for _ in range(self.centroids.shape[0])]
+        self._assign(np.arange(vectors.shape[0]), vectors)
+
+    def _assign(self, ids, vectors):
+        assignments = np.argmax(vectors @ self.centroids.T, axis=1)
+        order = np.argsort(assignments, kind="stable")
+        boundaries = np.searchsorted(assignments[order], np.arange(len(self._lists) + 1))
+        for list_id in range(len(self._lists)):
+            lo, hi = boundaries[list_id], boundaries[list_id + 1]
+            if hi > lo:
+                self._lists[list_id].extend(ids[order[lo:hi]])
+
+    def add(self, vector):
+        return self.add_batch(np.asarray(vector, dtype=np.float32)[None, :])[0]
+
+    def add_batch(self, vectors):
+        ids = self.storage.add_batch(vectors)
+        if self.is_trained:
+            self._assign(np.asarray(ids), self.storage.vectors[ids[0]:ids[-1] + 1])
+        elif len(self.storage) >= self.train_size:
+            self.train()
+        return ids
+
+    def remove(self, ids):
+        """Drops rows and compacts storage; survivors keep their inverted list."""
+        keep = self.storage.remove(ids)
+        if self.is_trained:
+            new_ids = np.cumsum(keep) - 1
+            for ids_list in self._lists:
+                ids_list.renumber(keep, new_ids)
+        return keep
+
+    def scores(self, query):
+        return self.storage.scores(query)
+
+    def search(self, query, top_k=3, n_probe=None):
+        """Returns (ids, scores) of approximately the `top_k` nearest vectors."""
+        if not self.is_trained:
+            return self.storage.search(query, top_k)
+        if len(self) == 0 or top_k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = VectorIndex.normalize(query).reshape(self.dim)
+        n_probe = min(n_probe or self.n_probe, len(self._lists))
+        probe, _ = top_k_indices(self.centroids @ query, n_probe)
+        candidates = np.concatenate([self._lists[i].ids for i in probe])
+        if candidates.size == 0:
+            return candidates, np.empty(0, dtype=np.float32)
+        order, scores = top_k_indices(self.storage.vectors[candidates] @ query, top_k)
+        return candidates[order], scores
@@ -0,0 +1,73 @@
+# AETHERIUS AGI - Lexical Index
+# Inverted index with Okapi BM25 scoring for keyword recall.
+
+import math
+import re
+from collections import Counter
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+class LexicalIndex:
+    """BM25 over documents identified by stable, increasing integer ids."""
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}
+        self._doc_terms = {}
+        self._lengths = np.zeros(1024, dtype=np.float32)  # by doc id
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def add(self, doc_id, text):
+        counts = Counter(tokenize(text))
+        self._doc_terms[doc_id] = (counts, sum(counts.values()))
+        self._total_length += sum(counts.values())
+        if doc_id >= self._lengths.shape[0]:
+            grown = np.zeros(max(doc_id + 1, 2 * self._lengths.shape[0]), dtype=np.float32)
+            grown[:self._lengths.shape[0]] = self._lengths
+            self._lengths = grown
+        self._lengths[doc_id] = sum(counts.values())
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+
+    def remove(self, doc_id):
+        counts, length = self._doc_terms.pop(doc_id)
+        self._total_length -= length
+        for term in counts:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+
+    def scores(self, query):
+        """Returns (doc_ids, scores) for every document sharing a query term."""
+        n_docs = len(self._doc_terms)
+        if n_docs == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        avg_length = self._total_length / n_docs
+        ids, parts = [], []
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            doc_ids = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+            tf = np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_ids] / avg_length)
+            ids.append(doc_ids)
+            parts.append(idf * tf * (self.k1 + 1) / (tf + norm))
+        if not ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        doc_ids, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(parts), minlength=len(doc_ids))
+        return doc_ids, scores.astype(np.float32)
@@ -1,39 +1,402 @@
-
-
 # AETHERIUS AGI - Memory Subsystem
 # Manages the storage and retrieval of memories.
 
+import functools
+import logging
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+from lexical_index import LexicalIndex, tokenize
+from metadata_index import MetadataIndex
+from persistent_store import PersistentMemoryStore, grow_mask
+from vector_index import VectorIndex, top_k_indices
+
+# The simulated embedder hashes words into this many signed buckets. Fewer
+# buckets collide too often: on 100k synthetic memories a 4-word query finds
+# its source memory in the top 5 99.7% of the time at 256 dimensions, 93% at
+# 128 and 45% at 64.
+EMBEDDING_DIM = 256
+# Search is exact by default. An exact scan reads every embedding, so it is
+# bound by memory bandwidth: about 10-12 ms per query at 100k x 256, and
+# sub-millisecond exact search at that size is not achievable.
+
+logger = logging.getLogger("aetherius.memory")
+
+
+def _synchronized(method):
+    """Serialises a method on the manager's lock so concurrent turns can share it."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _traced(span_name):
+    """Times a method as a "memory" span when the manager has a tracer."""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.tracer is None:
+                return method(self, *args, **kwargs)
+            with self.tracer.span(span_name, "memory"):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
 class MemoryManager:
-    def __init__(self):
-        # In a real implementation, this would connect to a vector database like Qdrant or a local FAISS index.
+    def __init__(self, embedding_dim=EMBEDDING_DIM, index=None, persist_dir=None,
+                 embedding_cache_size=10000, retention=None, embed_batch_window=None,
+                 embed_batch_size=64, tracer=None):
+        # The hot tier: entries live in `memory_store`, their embeddings live
+        # row-aligned in `index`. Pass an `IVFIndex` for approximate search
+        # over very large stores.
+        self.embedding_dim = embedding_dim
+        self._lock = threading.RLock()
+        self.tracer = tracer
         self.memory_store = []
+        self.index = index if index is not None else VectorIndex(embedding_dim)
+        self.embedding_cache = EmbeddingCache(embedding_cache_size)
+        self.retention = retention
+        self._hot_bytes = 0
+        self._embed_batcher = None
+        if embed_batch_window is not None:
+            # llm_interface/batching.py; launch.py puts it on sys.path.
+            from batching import MicroBatcher
+            self._embed_batcher = MicroBatcher(
+                self.embed_batch, embed_batch_size, embed_batch_window, name="embed"
+            )
+
+        # Metadata columns (row-aligned) and a BM25 index (keyed by a stable
+        # doc id) over the hot tier support filtered and hybrid recall.
+        self.metadata = MetadataIndex()
+        self.lexical = LexicalIndex()
+        self._next_doc_id = 0
+        self._row_of_doc = np.zeros(0, dtype=np.int64)
+
+        # The cold tier: with `persist_dir`, every memory is also written
+        # through to a memory-mapped disk store. Memories from earlier runs, or
+        # demoted by the retention policy, are served from disk without being
+        # loaded into RAM or re-embedded. `_resident` marks disk rows that are
+        # still in the hot tier so the two tiers never return the same memory.
+        self.disk = None
+        self._resident = np.zeros(0, dtype=bool)
+        # Sorted ids of live, non-resident disk rows: the only ones a search
+        # needs to score. Rebuilt lazily after demotion or tombstoning; new
+        # memories start resident, so storing leaves it valid.
+        self._cold = None
+        if persist_dir is not None:
+            self.disk = PersistentMemoryStore(persist_dir, embedding_dim)
+
+    def __len__(self):
+        cold = 0
+        if self.disk is not None:
+            cold = self.disk.live_count() - int(self._resident[:len(self.disk)].sum())
+        return len(self.memory_store) + cold
+
+    def embedding_batch_stats(self):
+        return self._embed_batcher.stats() if self._embed_batcher is not None else None
+
+    def close(self):
+        # The batcher flushes through embed_batch, so close it before locking.
+        if self._embed_batcher is not None:
+            self._embed_batcher.close()
+        with self._lock:
+            if self.disk is not None:
+                self.disk.close()
+
+    def _embed_uncached(self, texts):
+        # This would use a sentence transformer or other embedding model, which
+        # is where batching pays off. For now, we simulate one with a signed
+        # feature-hashed bag of words, which is deterministic across processes
+        # and gives meaningful overlap.
+        vectors = np.zeros((len(texts), self.embedding_dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                bucket = zlib.crc32(token.encode("utf-8"))
+                sign = 1.0 if bucket & 0x80000000 else -1.0
+                vectors[row, bucket % self.embedding_dim] += sign
+        return vectors
 
     def embed_text(self, text):
-        # This would use a sentence transformer or other embedding model.
-        # For now, we'll just simulate an embedding.
-        print(f"INFO: Embedding text: {text[:30]}...")
-        return [len(text), hash(text) % 1000] # Simulated vector
-
-    def store_memory(self, text):
-        """Embeds and stores a piece of text in the memory store."""
-        embedding = self.embed_text(text)
-        self.memory_store.append({"text": text, "embedding": embedding})
-        print(f"INFO: Stored memory. Store size: {len(self.memory_store)}")
-
-    def search_memory(self, query_text, top_k=3):
-        """Searches for the most relevant memories."""
+        """Embeds a single text, reusing a cached embedding when available.
+
+        With `embed_batch_window`, concurrent calls are coalesced into one
+        embed_batch call.
+        """
+        if self._embed_batcher is not None:
+            return self._embed_batcher.call(text)
+        return self.embed_batch([text])[0]
+
+    @_traced("memory.embed")
+    @_synchronized
+    def embed_batch(self, texts):
+        """Embeds many texts at once; only cache misses reach the model."""
+        vectors = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+        rows_by_text = {}
+        for row, text in enumerate(texts):
+            rows_by_text.setdefault(text, []).append(row)
+        pending = {}
+        for text, rows in rows_by_text.items():
+            cached = self.embedding_cache.get(text)
+            if cached is not None:
+                vectors[rows] = cached
+            else:
+                pending[text] = rows
+        if pending:
+            computed = self._embed_uncached(list(pending))
+            for vector, (text, rows) in zip(computed, pending.items()):
+                vectors[rows] = vector
+                self.embedding_cache.put(text, vector)
+        return vectors
+
+    def store_memory(self, text, metadata=None):
+        """Embeds and stores a piece of text in the memory store.
+
+        `metadata` is a flat dict of scalars such as {"session": ...,
+        "source": ...}; a "timestamp" field is added when missing. Metadata
+        that does not fit the existing columns (see MetadataIndex.check) raises
+        TypeError and nothing is stored.
+        """
+        self.store_memories([text], [metadata])
+
+    @_traced("memory.store")
+    @_synchronized
+    def store_memories(self, texts, metadatas=None):
+        """Embeds and stores many texts with one batched embedding call."""
+        texts = list(texts)
+        if not texts:
+            return
+        now = time.time()
+        metadatas = [
+            {"timestamp": now, **(metadata or {})}
+            for metadata in (metadatas or [None] * len(texts))
+        ]
+        self.metadata.check(metadatas)
+        embeddings = self.embed_batch(texts)
+        disk_ids = [None] * len(texts)
+        if self.disk is not None:
+            disk_ids = self.disk.append(texts, embeddings, metadatas)
+            self._resident = grow_mask(self._resident, len(self.disk))
+            self._resident[disk_ids] = True
+        self.index.add_batch(embeddings)
+        self.metadata.append(metadatas)
+
+        first_doc, first_row = self._next_doc_id, len(self.memory_store)
+        self._grow_row_of_doc(first_doc + len(texts))
+        self._row_of_doc[first_doc:first_doc + len(texts)] = np.arange(
+            first_row, first_row + len(texts)
+        )
+        for text, metadata, disk_id in zip(texts, metadatas, disk_ids):
+            nbytes = self.embedding_dim * 4 + len(text.encode("utf-8"))
+            self._hot_bytes += nbytes
+            doc_id = self._next_doc_id
+            self._next_doc_id += 1
+            self.lexical.add(doc_id, text)
+            self.memory_store.append({
+                "text": text,
+                "metadata": metadata,
+                "created_at": now,
+                "last_access": now,
+                "access_count": 0,
+                "disk_id": disk_id,
+                "doc_id": doc_id,
+                "nbytes": nbytes,
+            })
+        logger.info("Stored %d memories. Store size: %d", len(texts), len(self))
+        self.enforce_retention(now)
+
+    @_traced("memory.search")
+    def search_memory(self, query_text, top_k=3, filters=None, lexical_weight=0.0):
+        """Searches both tiers for the most relevant memories.
+
+        `filters` restricts recall by metadata (see MetadataIndex.mask), e.g.
+        {"session": "abc", "timestamp": (since, None)}; the filter mask is
+        applied before scoring, so only matching memories are scored.
+        `lexical_weight` blends BM25 keyword relevance (normalised to [0, 1])
+        into the cosine score; keyword matching covers the hot tier only, so
+        cold-tier scores are the weighted cosine term alone.
+        """
+        # Embed before taking the lock, so concurrent queries can share a batch.
         query_embedding = self.embed_text(query_text)
-        
-        # This is a simplified similarity search. A real implementation would use cosine similarity on vectors.
-        # For this placeholder, we'll just return the most recent memories.
-        print(f"INFO: Searching for memories similar to: {query_text[:30]}...")
-        
-        # Simulate returning the last `top_k` memories
-        results = self.memory_store[-top_k:]
+        logger.info("Searching for memories similar to: %.30s...", query_text)
+        return self._search_tiers(query_text, query_embedding, top_k, filters, lexical_weight)
+
+    @_synchronized
+    def _search_tiers(self, query_text, query_embedding, top_k, filters, lexical_weight):
+        now = time.time()
+        ids, scores = self._search_hot(query_text, query_embedding, top_k, filters, lexical_weight)
+        results = []
+        for i, score in zip(ids.tolist(), scores.tolist()):
+            entry = self.memory_store[i]
+            entry["last_access"] = now
+            entry["access_count"] += 1
+            results.append({"text": entry["text"], "metadata": entry["metadata"], "score": score})
+
+        if self.disk is not None:
+            if self._cold is None:
+                self._cold = self.disk.live_rows(exclude=self._resident)
+            rows = self._cold
+            if filters and rows.size:
+                rows = rows[self.disk.metadata_index().mask(filters)[rows]]
+            if rows.size == 0:
+                return results
+            disk_ids, disk_scores = self.disk.search(query_embedding, top_k, rows=rows)
+            results += [
+                {
+                    "text": self.disk.text(i),
+                    "metadata": self.disk.metadata(i),
+                    "score": (1.0 - lexical_weight) * score,
+                }
+                for i, score in zip(disk_ids.tolist(), disk_scores.tolist())
+            ]
+            results.sort(key=lambda result: result["score"], reverse=True)
+            del results[top_k:]
         return results
 
+    def _search_hot(self, query_text, query_embedding, top_k, filters, lexical_weight):
+        if not filters and not lexical_weight:
+            return self.index.search(query_embedding, top_k)
+
+        query = VectorIndex.normalize(query_embedding).reshape(self.embedding_dim)
+        if lexical_weight:
+            doc_ids, doc_scores = self.lexical.scores(query_text)
+            rows = self._row_of_doc[doc_ids]
+        if filters:
+            candidates = np.flatnonzero(self.metadata.mask(filters))
+        else:
+            # Rows without a keyword hit score on cosine alone, so the index's
+            # own top_k plus every keyword hit holds the hybrid top_k.
+            nearest, _ = self.index.search(query_embedding, top_k)
+            candidates = np.union1d(nearest, rows)
+        scores = self.index.vectors[candidates] @ query
+        if candidates.size == 0:
+            return candidates, scores
+
+        if lexical_weight:
+            lexical = np.zeros(len(self.memory_store), dtype=np.float32)
+            lexical[rows] = doc_scores
+            lexical = lexical[candidates]
+            peak = lexical.max()
+            if peak > 0:
+                lexical /= peak
+            scores = (1.0 - lexical_weight) * scores + lexical_weight * lexical
+        order, scores = top_k_indices(scores, top_k)
+        return candidates[order], scores
+
+    # ------------------------------------------------------------------
+    # Retention and consolidation
+    # ------------------------------------------------------------------
+    @_synchronized
+    def enforce_retention(self, now=None):
+        """Demotes the coldest hot memories once the retention budget is exceeded.
+
+        Demoted memories stay searchable from the disk tier; without a
+        `persist_dir` there is no cold tier and they are dropped.
+        Returns the number of memories demoted.
+        """
+        if self.retention is None:
+            return 0
+        if not self.retention.over_budget(len(self.memory_store), self._hot_bytes):
+            return 0
+        now = time.time() if now is None else now
+        sizes = np.array([entry["nbytes"] for entry in self.memory_store], dtype=np.int64)
+        rows = self.retention.select_evictions(self.memory_store, sizes, now)
+        self._remove_hot(rows)
+        if self.disk is None:
+            logger.warning("Dropped %d memories; no persist_dir for a cold tier.", len(rows))
+        return len(rows)
+
+    @_traced("memory.consolidate")
+    @_synchronized
+    def consolidate(self, threshold=0.95, max_block_elements=1 << 24):
+        """Merges near-duplicate memories into one copy.
+
+        Each hot memory is compared with every earlier one in row blocks sized
+        to `max_block_elements` similarity scores. A memory whose best match
+        reaches `threshold` is folded into that match: recall counts add up and
+        the most recent access wins. Duplicates are also tombstoned on disk.
+        Cold memories within `threshold` of a surviving hot memory are then
+        tombstoned too, since the hot copy is the one whose recall counts are
+        tracked. Returns the number of memories merged away.
+        """
+        merged = self._consolidate_hot(threshold, max_block_elements)
+        if self.disk is not None and len(self.memory_store):
+            cold = self.disk.near_duplicates(
+                self.index.vectors, threshold, exclude=self._resident,
+                max_block_elements=max_block_elements,
+            )
+            self.disk.delete(cold)
+            self._cold = None
+            merged += int(cold.size)
+        return merged
+
+    def _consolidate_hot(self, threshold, max_block_elements):
+        vectors = self.index.vectors
+        count = vectors.shape[0]
+        if count < 2:
+            return 0
+        parent = np.arange(count)
+        block = max(1, max_block_elements // count)
+        for start in range(1, count, block):
+            end = min(start + block, count)
+            sims = vectors[start:end] @ vectors[:end].T
+            rows = np.arange(start, end)[:, None]
+            sims[np.arange(end)[None, :] >= rows] = -np.inf
+            best = np.argmax(sims, axis=1)
+            matched = sims[np.arange(end - start), best] >= threshold
+            parent[start:end][matched] = best[matched]
+
+        duplicates = np.flatnonzero(parent != np.arange(count))
+        if duplicates.size == 0:
+            return 0
+        for row in duplicates.tolist():
+            # Parents always precede their children, so roots resolve in order.
+            parent[row] = parent[parent[row]]
+            survivor = self.memory_store[parent[row]]
+            entry = self.memory_store[row]
+            survivor["access_count"] += entry["access_count"]
+            survivor["last_access"] = max(survivor["last_access"], entry["last_access"])
+            survivor["created_at"] = min(survivor["created_at"], entry["created_at"])
+
+        if self.disk is not None:
+            self.disk.delete([
+                self.memory_store[row]["disk_id"] for row in duplicates.tolist()
+                if self.memory_store[row]["disk_id"] is not None
+            ])
+        self._remove_hot(duplicates)
+        return int(duplicates.size)
+
+    def _remove_hot(self, rows):
+        if len(rows) == 0:
+            return
+        for row in rows.tolist():
+            entry = self.memory_store[row]
+            self._hot_bytes -= entry["nbytes"]
+            self.lexical.remove(entry["doc_id"])
+            if entry["disk_id"] is not None:
+                self._resident[entry["disk_id"]] = False
+        self._cold = None
+        keep = self.index.remove(rows)
+        self.metadata.remove(keep)
+        self.memory_store = [entry for entry, kept in zip(self.memory_store, keep) if kept]
+        doc_ids = np.fromiter((entry["doc_id"] for entry in self.memory_store), dtype=np.int64)
+        self._row_of_doc[doc_ids] = np.arange(len(doc_ids))
+
+    def _grow_row_of_doc(self, size):
+        if size > len(self._row_of_doc):
+            grown = np.zeros(max(size, 2 * len(self._row_of_doc)), dtype=np.int64)
+            grown[:len(self._row_of_doc)] = self._row_of_doc
+            self._row_of_doc = grown
+
 # Example Usage (for testing)
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
     memory = MemoryManager()
     memory.store_memory("The user is interested in building an AGI.")
     memory.store_memory("The core loop of the AGI has been defined.")
@@ -42,5 +405,4 @@ if __name__ == "__main__":
     search_results = memory.search_memory("What is the user building?")
     print("\nSearch Results:")
     for result in search_results:
-        print(f"- {result['text']}")
-
+        print(f"- {result['text']} ({result['score']:.3f})")
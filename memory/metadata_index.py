@@ -0,0 +1,192 @@
+# AETHERIUS AGI - Metadata Index
+# Columnar memory metadata evaluated into boolean row masks for pre-filtering.
+#
+# With a `path`, columns are also kept on disk as append-only files:
+#   columns.json   [field, numeric] per column, in column order
+#   <n>.col        raw float64 (numeric) or int32 (value code) rows of column n
+#   <n>.codes      JSON values of column n's codes, one per line, in code order
+
+import json
+import numbers
+import os
+
+import numpy as np
+
+
+class _Column:
+    """Growable NumPy column; numeric fields hold floats, others hold value codes."""
+
+    def __init__(self, numeric, size):
+        self.numeric = numeric
+        self.codes = {}
+        self.saved_codes = 0
+        dtype, fill = (np.float64, np.nan) if numeric else (np.int32, -1)
+        self.fill = fill
+        self.values = np.full(max(16, size), fill, dtype=dtype)
+
+    def reserve(self, size):
+        if size > self.values.shape[0]:
+            grown = np.full(max(size, 2 * self.values.shape[0]), self.fill, self.values.dtype)
+            grown[:self.values.shape[0]] = self.values
+            self.values = grown
+
+    def encode(self, value):
+        if self.numeric:
+            if not _is_number(value):
+                raise TypeError(f"Expected a number, got {value!r}")
+            return float(value)
+        return self.codes.setdefault(value, len(self.codes))
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+
+def _is_scalar(value):
+    return value is None or isinstance(value, (str, bool, numbers.Real))
+
+
+class MetadataIndex:
+    def __init__(self, path=None, rows=0):
+        # With `path`, the first `rows` rows of the columns saved there are
+        # loaded and any rows past them (from an interrupted append) dropped.
+        self.path = path
+        self._size = 0
+        self._columns = {}
+        if path is not None:
+            self._open(rows)
+
+    def _manifest_path(self):
+        return os.path.join(self.path, "columns.json")
+
+    def _column_path(self, number, suffix):
+        return os.path.join(self.path, f"{number}.{suffix}")
+
+    def _open(self, rows):
+        os.makedirs(self.path, exist_ok=True)
+        if not os.path.exists(self._manifest_path()):
+            if rows:
+                raise ValueError(f"No metadata columns at {self.path} for {rows} rows")
+            self._save_manifest()
+            return
+        with open(self._manifest_path(), encoding="utf-8") as f:
+            manifest = json.load(f)
+        for number, (field, numeric) in enumerate(manifest):
+            column = self._columns[field] = _Column(numeric, rows)
+            values_path = self._column_path(number, "col")
+            itemsize = column.values.dtype.itemsize
+            if os.path.getsize(values_path) < rows * itemsize:
+                raise ValueError(f"Metadata column {field!r} at {self.path} is incomplete")
+            with open(values_path, "r+b") as f:
+                f.truncate(rows * itemsize)
+            column.values[:rows] = np.fromfile(values_path, dtype=column.values.dtype)
+            if not numeric:
+                with open(self._column_path(number, "codes"), encoding="utf-8") as f:
+                    for line in f:
+                        column.codes.setdefault(json.loads(line), len(column.codes))
+                column.saved_codes = len(column.codes)
+        self._size = rows
+
+    def _save_manifest(self):
+        tmp = self._manifest_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump([[field, column.numeric] for field, column in self._columns.items()], f)
+        os.replace(tmp, self._manifest_path())
+
+    def _save_rows(self, start, new_columns):
+        """Appends rows from `start` to the column files; new columns are written whole."""
+        for number, (field, column) in enumerate(self._columns.items()):
+            first = 0 if field in new_columns else start
+            mode = "wb" if field in new_columns else "ab"
+            if not column.numeric and len(column.codes) > column.saved_codes:
+                values = list(column.codes)[column.saved_codes:]
+                with open(self._column_path(number, "codes"), mode[0], encoding="utf-8") as f:
+                    f.writelines(json.dumps(value, ensure_ascii=False) + "\n" for value in values)
+                column.saved_codes = len(column.codes)
+            with open(self._column_path(number, "col"), mode) as f:
+                column.values[first:self._size].tofile(f)
+        if new_columns:
+            self._save_manifest()
+
+    def __len__(self):
+        return self._size
+
+    def check(self, metadatas):
+        """Raises TypeError if `metadatas` cannot be appended; nothing is changed.
+
+        Field names must be strings and values scalars (numbers, strings,
+        booleans or None). A field first seen with a number is numeric and
+        only takes numbers from then on.
+        """
+        numeric = {field: column.numeric for field, column in self._columns.items()}
+        for metadata in metadatas:
+            for field, value in (metadata or {}).items():
+                if not isinstance(field, str):
+                    raise TypeError(f"Metadata field names must be strings, got {field!r}")
+                if not _is_scalar(value):
+                    raise TypeError(f"Metadata field {field!r} must be a scalar, got {value!r}")
+                if numeric.setdefault(field, _is_number(value)) and not _is_number(value):
+                    raise TypeError(f"Metadata field {field!r} is numeric, got {value!r}")
+
+    def append(self, metadatas):
+        """Appends one metadata dict per new row; fields may differ between rows."""
+        self.check(metadatas)
+        start = self._size
+        self._size += len(metadatas)
+        for column in self._columns.values():
+            column.reserve(self._size)
+        new_columns = set()
+        for row, metadata in enumerate(metadatas, start):
+            for field, value in (metadata or {}).items():
+                column = self._columns.get(field)
+                if column is None:
+                    column = self._columns[field] = _Column(_is_number(value), self._size)
+                    new_columns.add(field)
+                column.values[row] = column.encode(value)
+        if self.path is not None:
+            self._save_rows(start, new_columns)
+
+    def remove(self, keep):
+        """Compacts every column with a boolean keep-mask over current rows."""
+        if self.path is not None:
+            raise ValueError("Saved metadata columns are append-only")
+        for column in self._columns.values():
+            survivors = column.values[:self._size][keep]
+            column.values[:survivors.shape[0]] = survivors
+            column.values[survivors.shape[0]:self._size] = column.fill
+        self._size = int(np.count_nonzero(keep))
+
+    def mask(self, filters):
+        """Evaluates filters into a boolean mask over rows.
+
+        Each filter maps a field to a value (equality), a list/set of values
+        (membership) or a `(low, high)` tuple (inclusive numeric range, either
+        bound may be None). Rows must match every filter.
+        """
+        mask = np.ones(self._size, dtype=bool)
+        for field, condition in filters.items():
+            column = self._columns.get(field)
+            if column is None:
+                return np.zeros(self._size, dtype=bool)
+            values = column.values[:self._size]
+            if isinstance(condition, tuple):
+                low, high = condition
+                if low is not None:
+                    mask &= values >= low
+                if high is not None:
+                    mask &= values <= high
+            elif isinstance(condition, (list, set, frozenset)):
+                codes = [_lookup(column, value) for value in condition]
+                mask &= np.isin(values, [code for code in codes if code is not None])
+            else:
+                code = _lookup(column, condition)
+                if code is None:
+                    return np.zeros(self._size, dtype=bool)
+                mask &= values == code
+        return mask
+
+
+def _lookup(column, value):
+    if column.numeric:
+        return float(value) if _is_number(value) else None
+    return column.codes.get(value)
@@ -0,0 +1,317 @@
+# AETHERIUS AGI - Persistent Memory Store
+# Append-only on-disk memory tier served through memory-mapped files.
+#
+# Layout of a store directory:
+#   store.json      header with the embedding dimension and format version
+#   embeddings.f32  raw row-major float32 matrix, one unit vector per memory
+#   texts.log       UTF-8 texts, concatenated in insertion order
+#   metadata.log    UTF-8 JSON metadata objects, concatenated in insertion order
+#   offsets.i64     int64 rows of (text offset, text length, metadata offset,
+#                   metadata length) locating each record in the two logs
+#   deleted.i64     row ids tombstoned by consolidation, in deletion order
+#   columns/        the metadata as filterable columns (see MetadataIndex)
+#   lock            held with an exclusive flock while the store is open, since
+#                   two writers would interleave appends and corrupt the offsets
+#
+# offsets.i64 is written last, so it acts as the commit record: a memory
+# exists once its offset row is on disk, and torn tails of the other files
+# are truncated on reopen.
+
+import json
+import os
+import shutil
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not POSIX; the store is left unlocked
+    fcntl = None
+
+from metadata_index import MetadataIndex
+from vector_index import VectorIndex, top_k_indices
+
+FORMAT_VERSION = 2
+_OFFSET_DTYPE = np.dtype(np.int64)
+_OFFSET_COLUMNS = 4
+_OFFSET_ROW_BYTES = _OFFSET_COLUMNS * _OFFSET_DTYPE.itemsize
+
+
+class PersistentMemoryStore:
+    def __init__(self, path, dim, chunk_rows=65536):
+        self.path = path
+        self.dim = dim
+        self.chunk_rows = chunk_rows
+        os.makedirs(path, exist_ok=True)
+        self._lock_file = self._acquire_lock()
+        try:
+            self._open()
+        except BaseException:
+            self._lock_file.close()
+            raise
+
+    def _acquire_lock(self):
+        lock_file = open(os.path.join(self.path, "lock"), "ab")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                raise RuntimeError(
+                    f"Memory store {self.path} is already open elsewhere; only one process may use it at a time"
+                ) from None
+        return lock_file
+
+    def _open(self):
+        path = self.path
+        self._check_header()
+
+        self._embeddings_path = os.path.join(path, "embeddings.f32")
+        self._texts_path = os.path.join(path, "texts.log")
+        self._metadata_path = os.path.join(path, "metadata.log")
+        self._offsets_path = os.path.join(path, "offsets.i64")
+        for file_path in (self._embeddings_path, self._texts_path, self._metadata_path,
+                          self._offsets_path):
+            open(file_path, "ab").close()
+
+        self._size = os.path.getsize(self._offsets_path) // _OFFSET_ROW_BYTES
+        self._truncate_torn_tails()
+        self._embeddings = open(self._embeddings_path, "ab")
+        self._texts = open(self._texts_path, "ab")
+        self._metadata = open(self._metadata_path, "ab")
+        self._offsets = open(self._offsets_path, "ab")
+        self._text_end = os.path.getsize(self._texts_path)
+        self._metadata_end = os.path.getsize(self._metadata_path)
+        self._maps = None
+        self._metadata_index = None
+        self._columns_path = os.path.join(path, "columns")
+
+        self._deleted_path = os.path.join(path, "deleted.i64")
+        self._deleted = np.zeros(0, dtype=bool)
+        if os.path.exists(self._deleted_path):
+            rows = np.fromfile(self._deleted_path, dtype=_OFFSET_DTYPE)
+            self._deleted = grow_mask(self._deleted, self._size)
+            self._deleted[rows[rows < self._size]] = True
+
+    def _check_header(self):
+        header_path = os.path.join(self.path, "store.json")
+        if os.path.exists(header_path):
+            with open(header_path, encoding="utf-8") as f:
+                header = json.load(f)
+            if header.get("version") != FORMAT_VERSION:
+                raise ValueError(
+                    f"Store at {self.path} has format version {header.get('version')}, "
+                    f"expected {FORMAT_VERSION}"
+                )
+            if header["dim"] != self.dim:
+                raise ValueError(
+                    f"Store at {self.path} has dim {header['dim']}, expected {self.dim}"
+                )
+            return
+        with open(header_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "version": FORMAT_VERSION}, f)
+
+    def _truncate_torn_tails(self):
+        """Drops bytes written by an append that never reached its commit record."""
+        with open(self._offsets_path, "r+b") as f:
+            f.truncate(self._size * _OFFSET_ROW_BYTES)
+        with open(self._embeddings_path, "r+b") as f:
+            f.truncate(self._size * self.dim * 4)
+        last = np.zeros(_OFFSET_COLUMNS, dtype=_OFFSET_DTYPE)
+        if self._size:
+            last = np.fromfile(
+                self._offsets_path, dtype=_OFFSET_DTYPE, count=_OFFSET_COLUMNS,
+                offset=(self._size - 1) * _OFFSET_ROW_BYTES,
+            )
+        with open(self._texts_path, "r+b") as f:
+            f.truncate(int(last[0] + last[1]))
+        with open(self._metadata_path, "r+b") as f:
+            f.truncate(int(last[2] + last[3]))
+
+    def __len__(self):
+        return self._size
+
+    def live_count(self):
+        """Number of rows that have not been tombstoned."""
+        return self._size - int(self._deleted[:self._size].sum())
+
+    def close(self):
+        self._maps = None
+        for f in (self._embeddings, self._texts, self._metadata, self._offsets):
+            f.close()
+        self._lock_file.close()  # releases the flock
+
+    def append(self, texts, vectors, metadatas=None):
+        """Durably appends memories and returns their row ids."""
+        vectors = VectorIndex.normalize(vectors).reshape(-1, self.dim)
+        metadatas = metadatas or [None] * len(texts)
+        self.metadata_index().check(metadatas)
+        encoded = [text.encode("utf-8") for text in texts]
+        encoded_metadata = [
+            json.dumps(metadata or {}, ensure_ascii=False).encode("utf-8")
+            for metadata in metadatas
+        ]
+        offsets = np.empty((len(encoded), _OFFSET_COLUMNS), dtype=_OFFSET_DTYPE)
+        text_position, metadata_position = self._text_end, self._metadata_end
+        for row, (data, metadata) in enumerate(zip(encoded, encoded_metadata)):
+            offsets[row] = (text_position, len(data), metadata_position, len(metadata))
+            text_position += len(data)
+            metadata_position += len(metadata)
+
+        self._texts.write(b"".join(encoded))
+        self._metadata.write(b"".join(encoded_metadata))
+        self._embeddings.write(vectors.tobytes())
+        for f in (self._texts, self._metadata, self._embeddings):
+            f.flush()
+        self.metadata_index().append(metadatas)
+        self._offsets.write(offsets.tobytes())
+        self._offsets.flush()
+
+        start = self._size
+        self._size += len(encoded)
+        self._text_end = text_position
+        self._metadata_end = metadata_position
+        self._maps = None
+        return list(range(start, self._size))
+
+    def delete(self, rows):
+        """Tombstones rows so searches skip them; the data stays in the log."""
+        rows = np.asarray(rows, dtype=_OFFSET_DTYPE)
+        if rows.size == 0:
+            return
+        with open(self._deleted_path, "ab") as f:
+            f.write(rows.tobytes())
+        self._deleted = grow_mask(self._deleted, self._size)
+        self._deleted[rows] = True
+
+    def _mapped(self):
+        """(embeddings, offsets, texts, metadata) memory maps, refreshed after appends."""
+        if self._maps is None:
+            embeddings = np.memmap(
+                self._embeddings_path, dtype=np.float32, mode="r", shape=(self._size, self.dim)
+            )
+            offsets = np.memmap(
+                self._offsets_path, dtype=_OFFSET_DTYPE, mode="r",
+                shape=(self._size, _OFFSET_COLUMNS),
+            )
+            texts = np.memmap(self._texts_path, dtype=np.uint8, mode="r") if self._text_end else None
+            metadata = np.memmap(self._metadata_path, dtype=np.uint8, mode="r")
+            self._maps = (embeddings, offsets, texts, metadata)
+        return self._maps
+
+    @property
+    def vectors(self):
+        return self._mapped()[0] if self._size else np.empty((0, self.dim), np.float32)
+
+    def text(self, row):
+        _, offsets, texts, _ = self._mapped()
+        start, length = (int(v) for v in offsets[row, :2])
+        return bytes(texts[start:start + length]).decode("utf-8")
+
+    def metadata(self, row):
+        _, offsets, _, metadata = self._mapped()
+        start, length = (int(v) for v in offsets[row, 2:])
+        return json.loads(bytes(metadata[start:start + length]).decode("utf-8"))
+
+    def metadata_index(self):
+        """Columnar metadata for filtering, loaded from the saved columns on first use."""
+        if self._metadata_index is None:
+            manifest = os.path.join(self._columns_path, "columns.json")
+            if self._size and not os.path.exists(manifest):
+                self._build_columns()
+            self._metadata_index = MetadataIndex(self._columns_path, self._size)
+        return self._metadata_index
+
+    def _build_columns(self):
+        """Writes the metadata columns of a store that predates them, from the log."""
+        tmp = self._columns_path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        columns = MetadataIndex(tmp)
+        for start in range(0, self._size, self.chunk_rows):
+            end = min(start + self.chunk_rows, self._size)
+            columns.append([self.metadata(row) for row in range(start, end)])
+        shutil.rmtree(self._columns_path, ignore_errors=True)
+        os.replace(tmp, self._columns_path)
+
+    def search(self, query, top_k=3, exclude=None, rows=None):
+        """Top-k cosine search streamed over the mapped matrix in fixed-size chunks.
+
+        Only `chunk_rows` rows are paged in at a time, so resident memory stays
+        bounded however large the store grows. Tombstoned rows are skipped, as
+        are rows set in the optional boolean `exclude` mask. With `rows` (a
+        sorted array of row ids, e.g. a filter's matches), only those rows are
+        read and scored.
+        """
+        if self._size == 0 or top_k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = VectorIndex.normalize(query).reshape(self.dim)
+        embeddings = self._mapped()[0]
+        self._deleted = grow_mask(self._deleted, self._size)
+        skip = self._deleted[:self._size]
+        if exclude is not None:
+            skip = skip | grow_mask(exclude, self._size)[:self._size]
+        if rows is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+            rows = rows[~skip[rows]]
+        total = self._size if rows is None else rows.shape[0]
+        best_ids = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, total, self.chunk_rows):
+            end = min(start + self.chunk_rows, total)
+            if rows is None:
+                ids = np.arange(start, end)
+                scores = np.asarray(embeddings[start:end] @ query)
+                scores[skip[start:end]] = -np.inf
+            else:
+                ids = rows[start:end]
+                first, last = int(ids[0]), int(ids[-1]) + 1
+                if last - first <= 2 * ids.shape[0]:
+                    # Mostly-contiguous rows: a slice streams faster than a gather.
+                    scores = np.asarray(embeddings[first:last] @ query)[ids - first]
+                else:
+                    scores = embeddings[ids] @ query
+            order, scores = top_k_indices(scores, top_k)
+            best_ids = np.concatenate([best_ids, ids[order]])
+            best_scores = np.concatenate([best_scores, scores])
+        order, best_scores = top_k_indices(best_scores, top_k)
+        keep = np.isfinite(best_scores)
+        return best_ids[order][keep], best_scores[keep]
+
+
+    def live_rows(self, exclude=None):
+        """Row ids that are neither tombstoned nor set in the optional `exclude` mask."""
+        self._deleted = grow_mask(self._deleted, self._size)
+        skip = self._deleted[:self._size]
+        if exclude is not None:
+            skip = skip | grow_mask(exclude, self._size)[:self._size]
+        return np.flatnonzero(~skip)
+
+    def near_duplicates(self, vectors, threshold, exclude=None, max_block_elements=1 << 24):
+        """Live rows whose cosine similarity to any of `vectors` reaches `threshold`.
+
+        Rows are streamed in blocks of at most `max_block_elements` scores;
+        rows set in the optional boolean `exclude` mask are skipped.
+        """
+        vectors = VectorIndex.normalize(vectors).reshape(-1, self.dim)
+        if self._size == 0 or vectors.shape[0] == 0:
+            return np.empty(0, dtype=np.int64)
+        embeddings = self._mapped()[0]
+        self._deleted = grow_mask(self._deleted, self._size)
+        skip = self._deleted[:self._size]
+        if exclude is not None:
+            skip = skip | grow_mask(exclude, self._size)[:self._size]
+        block = max(1, min(self.chunk_rows, max_block_elements // vectors.shape[0]))
+        matches = []
+        for start in range(0, self._size, block):
+            end = min(start + block, self._size)
+            best = np.asarray(embeddings[start:end] @ vectors.T).max(axis=1)
+            matches.append(start + np.flatnonzero((best >= threshold) & ~skip[start:end]))
+        return np.concatenate(matches)
+
+def grow_mask(mask, size):
+    """Returns `mask` padded with False to at least `size`, doubling capacity."""
+    if mask.shape[0] >= size:
+        return mask
+    grown = np.zeros(max(size, 2 * mask.shape[0]), dtype=bool)
+    grown[:mask.shape[0]] = mask
+    return grown
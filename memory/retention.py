@@ -0,0 +1,59 @@
+# AETHERIUS AGI - Memory Retention
+# Decides which in-RAM memories are cold enough to leave the hot tier.
+
+import numpy as np
+
+
+class RetentionPolicy:
+    """Budget and ranking rules for the hot memory tier.
+
+    max_count / max_bytes   hot-tier budgets; None disables a budget.
+    strategy                "lru" ranks by last recall, "lfu" by recall count.
+    half_life               seconds over which a memory's warmth halves with
+                            age since its last recall; None disables decay.
+    low_water               fraction of the budget to evict down to, so a full
+                            hot tier is compacted once per batch, not per store.
+    """
+
+    def __init__(self, max_count=None, max_bytes=None, strategy="lru",
+                 half_life=None, low_water=0.9):
+        if strategy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown retention strategy: {strategy}")
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+        self.strategy = strategy
+        self.half_life = half_life
+        self.low_water = low_water
+
+    def over_budget(self, count, size_bytes):
+        return (
+            (self.max_count is not None and count > self.max_count)
+            or (self.max_bytes is not None and size_bytes > self.max_bytes)
+        )
+
+    def warmth(self, entries, now):
+        """Scores entries so that the coldest ones sort first."""
+        last_access = np.array([entry["last_access"] for entry in entries], dtype=np.float64)
+        if self.strategy == "lru":
+            # Age decay cannot change a pure recency ordering.
+            return last_access
+        warmth = np.array([entry["access_count"] + 1 for entry in entries], dtype=np.float64)
+        if self.half_life:
+            warmth *= np.exp2(-(now - last_access) / self.half_life)
+        return warmth
+
+    def select_evictions(self, entries, sizes, now):
+        """Returns the row ids to demote so the tier falls under its low-water mark."""
+        count = len(entries)
+        total_bytes = int(sizes.sum())
+        if not self.over_budget(count, total_bytes):
+            return np.empty(0, dtype=np.int64)
+        order = np.argsort(self.warmth(entries, now), kind="stable")
+        evict = 0
+        if self.max_count is not None:
+            evict = max(evict, count - int(self.max_count * self.low_water))
+        if self.max_bytes is not None:
+            target = self.max_bytes * self.low_water
+            freed = np.cumsum(sizes[order])
+            evict = max(evict, int(np.searchsorted(freed, total_bytes - target)) + 1)
+        return np.sort(order[:min(evict, count)])
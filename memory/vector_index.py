@@ -0,0 +1,88 @@
+# AETHERIUS AGI - Vector Index
+# Exact cosine-similarity index over a contiguous float32 matrix.
+
+import numpy as np
+
+
+class VectorIndex:
+    def __init__(self, dim, initial_capacity=1024):
+        self.dim = dim
+        self._vectors = np.zeros((max(1, initial_capacity), dim), dtype=np.float32)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def vectors(self):
+        """A view of the stored (unit-normalised) vectors."""
+        return self._vectors[:self._size]
+
+    def _reserve(self, extra):
+        """Grows the backing matrix by doubling so appends stay amortised O(1)."""
+        needed = self._size + extra
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        grown = np.zeros((capacity, self.dim), dtype=np.float32)
+        grown[:self._size] = self._vectors[:self._size]
+        self._vectors = grown
+
+    @staticmethod
+    def normalize(vectors):
+        """Scales rows to unit length; all-zero rows are left as zeros."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        np.maximum(norms, 1e-12, out=norms)
+        return vectors / norms
+
+    def add(self, vector):
+        """Adds a single vector and returns its row id."""
+        return self.add_batch(np.asarray(vector, dtype=np.float32)[None, :])[0]
+
+    def add_batch(self, vectors):
+        """Adds a 2-D batch of vectors and returns their row ids."""
+        vectors = self.normalize(vectors).reshape(-1, self.dim)
+        count = vectors.shape[0]
+        self._reserve(count)
+        start = self._size
+        self._vectors[start:start + count] = vectors
+        self._size += count
+        return list(range(start, start + count))
+
+    def remove(self, ids):
+        """Drops rows and compacts the matrix; surviving rows keep their order.
+
+        Returns the boolean keep-mask so callers can compact row-aligned data.
+        """
+        keep = np.ones(self._size, dtype=bool)
+        keep[np.asarray(ids, dtype=np.int64)] = False
+        survivors = self._vectors[:self._size][keep]
+        self._vectors[:survivors.shape[0]] = survivors
+        self._vectors[survivors.shape[0]:self._size] = 0
+        self._size = survivors.shape[0]
+        return keep
+
+    def scores(self, query):
+        """Cosine similarity of `query` against every stored vector."""
+        query = self.normalize(query).reshape(self.dim)
+        return self.vectors @ query
+
+    def search(self, query, top_k=3):
+        """Returns (ids, scores) of the `top_k` most similar vectors, best first."""
+        if self._size == 0 or top_k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return top_k_indices(self.scores(query), top_k)
+
+
+def top_k_indices(scores, top_k):
+    """Selects the `top_k` largest scores with argpartition, sorted descending."""
+    top_k = min(top_k, scores.shape[0])
+    if top_k < scores.shape[0]:
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        candidates = np.arange(scores.shape[0])
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return order, scores[order]
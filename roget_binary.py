@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Compact binary format for thesaurus data.
+
+A file holds one `ClassVI`-shaped hierarchy as flat arrays of little-endian
+uint32, so loading it is an `mmap` plus a header parse rather than a rebuild
+from Python literals:
+
+    header    magic, version and the counts below
+    strings   n_strings + 1 offsets into the UTF-8 blob (interned strings)
+    sections  name ids, then n_sections + 1 start indices into titles
+    titles    name ids, then n_titles + 1 start indices into categories
+    cats      name ids (NO_NAME for a plain list section), then
+              n_cats + 1 start indices into terms
+    terms     string ids
+    blob      the string bytes
+
+Each `Section` is materialized from the arrays the first time its top-level
+section is accessed; untouched parts of the file are never read into memory.
+"""
+from __future__ import annotations
+
+import array
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from roget_system import ClassVI, Section
+
+MAGIC = b"RGTB"
+FORMAT_VERSION = 1
+NO_NAME = 0xFFFFFFFF
+_HEADER = struct.Struct("<4sHHIIIIII")
+_NATIVE_LE = sys.byteorder == "little"
+
+
+def _uint32(values) -> array.array:
+    data = array.array("I", values)
+    if data.itemsize != 4:  # pragma: no cover - exotic platforms
+        raise RuntimeError("array('I') is not 32 bits on this platform")
+    return data
+
+
+def save_binary(class_vi: ClassVI, path: str) -> None:
+    """Write `class_vi` to `path` in the binary format (atomically)."""
+    strings: Dict[str, int] = {}
+
+    def intern(text: str) -> int:
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(strings)
+        return index
+
+    section_name, section_start = _uint32([]), _uint32([0])
+    title_name, title_start = _uint32([]), _uint32([0])
+    cat_name, cat_start = _uint32([]), _uint32([0])
+    term_string = _uint32([])
+    for name, sects in class_vi.sections.items():
+        section_name.append(intern(name))
+        for sec in sects:
+            title_name.append(intern(sec.title))
+            groups = sec.entries.items() if isinstance(sec.entries, dict) else [(None, sec.entries)]
+            for cat, terms in groups:
+                cat_name.append(NO_NAME if cat is None else intern(cat))
+                term_string.extend(intern(term) for term in terms)
+                cat_start.append(len(term_string))
+            title_start.append(len(cat_name))
+        section_start.append(len(title_name))
+
+    encoded = [text.encode("utf-8") for text in strings]
+    string_start = _uint32([0])
+    for data in encoded:
+        string_start.append(string_start[-1] + len(data))
+
+    arrays = [string_start, section_name, section_start, title_name, title_start,
+              cat_name, cat_start, term_string]
+    if not _NATIVE_LE:  # pragma: no cover - big-endian hosts
+        for data in arrays:
+            data.byteswap()
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(strings), len(section_name),
+                          len(title_name), len(cat_name), len(term_string), string_start[-1])
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        for data in arrays:
+            data.tofile(f)
+        f.write(b"".join(encoded))
+    os.replace(tmp, path)
+
+
+class BinaryThesaurus(Mapping):
+    """Read-only, memory-mapped view of a binary thesaurus file.
+
+    Behaves as the `sections` mapping of a `ClassVI` (section name -> list of
+    `Section`), materializing each section on first access. Close it (or use
+    it as a context manager) to release the mapping.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open()
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _open(self) -> None:
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError("Truncated thesaurus file")
+        (magic, version, _, n_strings, n_sections, n_titles, n_cats, n_terms,
+         blob_size) = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError("Not a binary thesaurus file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported thesaurus format version {version}")
+        lengths = [n_strings + 1, n_sections, n_sections + 1, n_titles, n_titles + 1,
+                   n_cats, n_cats + 1, n_terms]
+        if len(self._mmap) != _HEADER.size + 4 * sum(lengths) + blob_size:
+            raise ValueError("Corrupt thesaurus file: size does not match header")
+        view = memoryview(self._mmap)
+        self._views = [view]
+        offset = _HEADER.size
+        arrays = []
+        for length in lengths:
+            raw = view[offset:offset + 4 * length]
+            if _NATIVE_LE:
+                arrays.append(raw.cast("I"))
+                self._views.append(arrays[-1])
+            else:  # pragma: no cover - big-endian hosts copy and swap
+                data = array.array("I", raw)
+                data.byteswap()
+                arrays.append(data)
+            offset += 4 * length
+        (self._string_start, self._section_name, self._section_start, self._title_name,
+         self._title_start, self._cat_name, self._cat_start, self._term_string) = arrays
+        self._blob = offset
+        self._index = {self.string(self._section_name[i]): i for i in range(n_sections)}
+        self._materialized: Dict[str, List[Section]] = {}
+
+    def string(self, index: int) -> str:
+        start = self._blob + self._string_start[index]
+        end = self._blob + self._string_start[index + 1]
+        return self._mmap[start:end].decode("utf-8")
+
+    @property
+    def term_count(self) -> int:
+        return len(self._term_string)
+
+    def __getitem__(self, name: str) -> List[Section]:
+        sects = self._materialized.get(name)
+        if sects is None:
+            sects = self._materialized[name] = self._section(self._index[name])
+        return sects
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def iter_uncached(self) -> Iterator[Tuple[str, List[Section]]]:
+        """Yield (name, sections) in file order without keeping them materialized."""
+        for name, i in self._index.items():
+            yield name, self._materialized.get(name) or self._section(i)
+
+    def _section(self, i: int) -> List[Section]:
+        sects = []
+        for t in range(self._section_start[i], self._section_start[i + 1]):
+            groups = {}
+            for c in range(self._title_start[t], self._title_start[t + 1]):
+                name: Optional[str] = None
+                if self._cat_name[c] != NO_NAME:
+                    name = self.string(self._cat_name[c])
+                terms = self._term_string[self._cat_start[c]:self._cat_start[c + 1]]
+                groups[name] = [self.string(s) for s in terms]
+            entries = groups[None] if list(groups) == [None] else groups
+            sects.append(Section(title=self.string(self._title_name[t]), entries=entries))
+        return sects
+
+    def close(self) -> None:
+        self._materialized.clear()
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def __enter__(self) -> "BinaryThesaurus":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def load_binary(path: str) -> ClassVI:
+    """Map `path` and return a `ClassVI` whose sections materialize lazily."""
+    return ClassVI(sections=BinaryThesaurus(path))
+
+
+if __name__ == "__main__":  # pragma: no cover - manual use
+    from roget_system import build_class_vi
+
+    build_class_vi().save_binary("class_vi.bin")
+    thesaurus = load_binary("class_vi.bin")
+    print(f"{os.path.getsize('class_vi.bin')} bytes, "
+          f"{thesaurus.sections.term_count} terms in {len(thesaurus.sections)} sections")
+    assert thesaurus.to_dict() == build_class_vi().to_dict()
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""Streaming exporters for thesaurus data.
+
+`ClassVI.save_json` and `save_pdf` build the whole document before writing
+it. The writers here walk the thesaurus one top-level section at a time and
+write as they go, so export memory is bounded by the largest section rather
+than by the size of the thesaurus:
+
+* `write_json` produces the same document as `save_json`, incrementally;
+* `write_jsonl` writes one category per line;
+* `PDFWriter` is a small self-contained PDF writer (built-in Helvetica, no
+  FPDF needed) that paginates as it goes and writes out each section's pages
+  as soon as the section ends.
+
+`export_shards` writes one file per section and format next to a manifest of
+content hashes, and on later runs rewrites only the sections whose content
+changed.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import zlib
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from roget_system import ClassVI, Section
+
+EXPORT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+SectionItem = Tuple[str, List[Section]]
+
+
+def walk(class_vi: ClassVI) -> Iterator[SectionItem]:
+    """Yield (section name, sections) pairs one at a time.
+
+    Memory-mapped thesauri (see roget_binary) are streamed without caching
+    the materialized sections.
+    """
+    sections = class_vi.sections
+    stream = getattr(sections, "iter_uncached", None)
+    if stream is not None:
+        yield from stream()
+        return
+    for name in sections:
+        yield name, sections[name]
+
+
+def iter_records(sections: Iterable[SectionItem]) -> Iterator[Dict[str, object]]:
+    """One record per category: section, title, category and terms.
+
+    Plain list sections become a single record with category None.
+    """
+    for name, sects in sections:
+        for sec in sects:
+            groups = sec.entries.items() if isinstance(sec.entries, dict) else [(None, sec.entries)]
+            for cat, terms in groups:
+                yield {"section": name, "title": sec.title, "category": cat, "terms": terms}
+
+
+def section_hash(name: str, sects: List[Section]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([EXPORT_VERSION, name], ensure_ascii=False).encode("utf-8"))
+    for sec in sects:
+        digest.update(json.dumps([sec.title, sec.entries], ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+# ----------------------------------------------------------------------
+# JSON
+# ----------------------------------------------------------------------
+def write_json(sections: Iterable[SectionItem], f: IO[str]) -> None:
+    """Write the `ClassVI.to_dict()` document, as `save_json` would, section by section."""
+    first = True
+    f.write("{")
+    for name, sects in sections:
+        f.write(("" if first else ",") + "\n  " + json.dumps(name, ensure_ascii=False) + ": [")
+        for i, sec in enumerate(sects):
+            body = json.dumps({"title": sec.title, "entries": sec.entries},
+                              ensure_ascii=False, indent=2)
+            f.write(("," if i else "") + "\n    " + body.replace("\n", "\n    "))
+        f.write("\n  ]" if sects else "]")
+        first = False
+    f.write("}" if first else "\n}")
+
+
+def write_jsonl(sections: Iterable[SectionItem], f: IO[str]) -> None:
+    """Write one JSON object per category per line."""
+    for record in iter_records(sections):
+        f.write(json.dumps(record, ensure_ascii=False))
+        f.write("\n")
+
+
+# ----------------------------------------------------------------------
+# PDF
+# ----------------------------------------------------------------------
+# Helvetica advance widths (1/1000 em) for ASCII 32..126, from the standard AFM.
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_BOLD_FACTOR = 1.08  # Helvetica-Bold runs about this much wider
+
+
+def text_width(text: str, size: float, bold: bool = False) -> float:
+    units = sum(
+        _HELVETICA_WIDTHS[ord(char) - 32] if 32 <= ord(char) <= 126 else 556 for char in text
+    )
+    return units * size / 1000 * (_BOLD_FACTOR if bold else 1.0)
+
+
+def wrap(text: str, width: float, size: float, bold: bool = False) -> List[str]:
+    """Greedy word wrap to `width` points; over-long words get a line of their own."""
+    lines: List[str] = []
+    line = ""
+    for word in text.split(" "):
+        candidate = f"{line} {word}" if line else word
+        if line and text_width(candidate, size, bold) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    lines.append(line)
+    return lines
+
+
+def _pdf_string(text: str) -> bytes:
+    data = text.encode("cp1252", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+class PDFWriter:
+    """Minimal streaming PDF 1.4 writer for text documents.
+
+    Objects are written to `f` (a binary file) as soon as a page is complete;
+    only the current page's text and the object offsets stay in memory.
+    `section_break` ends the current page and flushes `f`.
+    """
+
+    PAGE_WIDTH = 595.0  # A4, in points
+    PAGE_HEIGHT = 842.0
+    MARGIN = 50.0
+
+    def __init__(self, f: IO[bytes], size: float = 11.0, leading: float = 14.0) -> None:
+        self.f = f
+        self.size = size
+        self.leading = leading
+        self._offsets: Dict[int, int] = {}
+        self._position = 0
+        self._next_id = 5  # 1 catalog, 2 page tree, 3 and 4 fonts
+        self._pages: List[int] = []
+        self._ops: List[bytes] = []
+        self._y = 0.0
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+                        b"/Encoding /WinAnsiEncoding >>")
+        self._object(4, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold "
+                        b"/Encoding /WinAnsiEncoding >>")
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages) + bool(self._ops)
+
+    def _write(self, data: bytes) -> None:
+        self.f.write(data)
+        self._position += len(data)
+
+    def _object(self, number: int, body: bytes) -> None:
+        self._offsets[number] = self._position
+        self._write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+    def _allocate(self) -> int:
+        self._next_id += 1
+        return self._next_id - 1
+
+    def line(self, text: str, indent: float = 0.0, bold: bool = False,
+             size: Optional[float] = None) -> None:
+        """Add `text` as one or more wrapped lines, starting a new page when full."""
+        size = size or self.size
+        width = self.PAGE_WIDTH - 2 * self.MARGIN - indent
+        for part in wrap(text, width, size, bold):
+            if not self._ops or self._y - self.leading < self.MARGIN:
+                self.end_page()
+                self._y = self.PAGE_HEIGHT - self.MARGIN
+                self._ops.append(b"BT")
+            self._y -= self.leading
+            self._ops.append(b"/F%d %.1f Tf 1 0 0 1 %.2f %.2f Tm %s Tj" % (
+                4 if bold else 3, size, self.MARGIN + indent, self._y, _pdf_string(part)))
+
+    def space(self, points: float) -> None:
+        self._y -= points
+
+    def end_page(self) -> None:
+        if not self._ops:
+            return
+        self._ops.append(b"ET")
+        content = zlib.compress(b"\n".join(self._ops))
+        self._ops = []
+        stream_id, page_id = self._allocate(), self._allocate()
+        self._object(stream_id, b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content)
+                     + content + b"\nendstream")
+        self._object(page_id, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+                              b"/Resources << /Font << /F3 3 0 R /F4 4 0 R >> >> "
+                              b"/Contents %d 0 R >>"
+                     % (self.PAGE_WIDTH, self.PAGE_HEIGHT, stream_id))
+        self._pages.append(page_id)
+
+    def section_break(self) -> None:
+        self.end_page()
+        self.f.flush()
+
+    def close(self) -> None:
+        """Write the page tree, catalog and cross-reference table."""
+        self.end_page()
+        kids = b" ".join(b"%d 0 R" % page for page in self._pages)
+        self._object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._pages)))
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        xref = self._position
+        count = self._next_id
+        entries = [b"0000000000 65535 f \n"]
+        entries += [b"%010d 00000 n \n" % self._offsets[n] for n in range(1, count)]
+        self._write(b"xref\n0 %d\n" % count + b"".join(entries))
+        self._write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                    % (count, xref))
+        self.f.flush()
+
+
+def write_pdf(sections: Iterable[SectionItem], f: IO[bytes],
+              title: str = "Roget's Thesaurus - Class VI") -> int:
+    """Lay out `sections` as save_pdf does, one section per page run; returns the page count."""
+    pdf = PDFWriter(f)
+    pdf.line(title, size=14, bold=True)
+    for name, sects in sections:
+        pdf.space(4)
+        pdf.line(name, bold=True)
+        for sec in sects:
+            pdf.line(sec.title, indent=12, bold=True)
+            if isinstance(sec.entries, dict):
+                for cat, terms in sec.entries.items():
+                    pdf.line(f"{cat}: {', '.join(terms)}", indent=24, size=10)
+            else:
+                pdf.line(", ".join(sec.entries), indent=24, size=10)
+        pdf.section_break()
+    pdf.close()
+    return pdf.page_count
+
+
+# ----------------------------------------------------------------------
+# Files and shards
+# ----------------------------------------------------------------------
+WRITERS = {
+    "json": (write_json, "w"),
+    "jsonl": (write_jsonl, "w"),
+    "pdf": (write_pdf, "wb"),
+}
+
+
+def _write_file(path: str, fmt: str, sections: Iterable[SectionItem]) -> None:
+    writer, mode = WRITERS[fmt]
+    tmp = f"{path}.tmp"
+    with open(tmp, mode, **({"encoding": "utf-8"} if mode == "w" else {})) as f:
+        writer(sections, f)
+    os.replace(tmp, path)
+
+
+def export(class_vi: ClassVI, path: str, fmt: Optional[str] = None) -> None:
+    """Stream `class_vi` to `path`; `fmt` defaults to the file extension."""
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format '{fmt}' (expected one of {sorted(WRITERS)})")
+    _write_file(path, fmt, walk(class_vi))
+
+
+def _slug(name: str, taken: set) -> str:
+    base = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "section"
+    slug, n = base, 2
+    while slug in taken:
+        slug, n = f"{base}-{n}", n + 1
+    taken.add(slug)
+    return slug
+
+
+def export_shards(class_vi: ClassVI, directory: str, formats: Iterable[str] = ("json",),
+                  force: bool = False) -> Dict[str, List[str]]:
+    """Export each section to its own file per format under `directory`.
+
+    A manifest records each section's content hash. Sections whose hash and
+    files are unchanged since the last export are skipped, shards of removed
+    sections are deleted. Returns the section names written, skipped and
+    removed.
+    """
+    formats = list(formats)
+    for fmt in formats:
+        if fmt not in WRITERS:
+            raise ValueError(f"Unknown export format '{fmt}' (expected one of {sorted(WRITERS)})")
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    previous: Dict[str, dict] = {}
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == EXPORT_VERSION:
+            previous = manifest["sections"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    current: Dict[str, dict] = {}
+    taken: set = set()
+    report: Dict[str, List[str]] = {"written": [], "skipped": [], "removed": []}
+    for name, sects in walk(class_vi):
+        digest = section_hash(name, sects)
+        old = previous.get(name, {})
+        slug = _slug(name, taken)
+        files = {fmt: f"{slug}.{fmt}" for fmt in formats}
+        unchanged = (
+            not force and old.get("hash") == digest and old.get("files") == files
+            and all(os.path.exists(os.path.join(directory, file)) for file in files.values())
+        )
+        if not unchanged:
+            for fmt, file in files.items():
+                _write_file(os.path.join(directory, file), fmt, [(name, sects)])
+        report["skipped" if unchanged else "written"].append(name)
+        current[name] = {"hash": digest, "files": files}
+
+    kept = {file for entry in current.values() for file in entry["files"].values()}
+    for name, entry in previous.items():
+        for file in set(entry.get("files", {}).values()) - kept:
+            try:
+                os.remove(os.path.join(directory, file))
+            except FileNotFoundError:
+                pass
+        if name not in current:
+            report["removed"].append(name)
+
+    tmp = f"{manifest_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": EXPORT_VERSION, "sections": current}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, manifest_path)
+    return report
+
+
+if __name__ == "__main__":  # pragma: no cover - manual use
+    from roget_system import build_class_vi
+
+    thesaurus = build_class_vi()
+    for path in ("class_vi.json", "class_vi.jsonl", "class_vi.pdf"):
+        export(thesaurus, path)
+    print(export_shards(thesaurus, "class_vi_export", formats=("json", "pdf")))
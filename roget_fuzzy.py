@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""Fuzzy term matching for the thesaurus.
+
+Input words are often misspelled or inflected ("delihgted", "fearfully")
+and miss the exact term index. `FuzzyMatcher` finds the closest thesaurus
+terms anyway:
+
+* light suffix stemming folds inflections together ("fearfully", "fearful"
+  and "fear" all stem to "fear"), and matching is done between stems;
+* a character trigram index, keyed by length, generates candidates for
+  longer words: shared trigrams are counted with one `np.bincount`, which
+  also gives a lower bound on each candidate's edit distance;
+* short words, where trigrams are too coarse to filter, are looked up in an
+  index of single-character deletions (two words within one edit share a
+  deletion variant);
+* candidates are verified in order of that lower bound with a bit-parallel
+  Levenshtein distance, stopping once nothing left can enter the top k, and
+  scored 1 - distance / length, exact surface matches scoring 1.0;
+* a BK-tree answers exhaustive "everything within n edits" queries (`within`).
+
+The edit budget grows with the stem (`max_distance`): stems of 3 characters
+or fewer must match exactly, 4 to 6 characters allow one edit and longer
+stems two. So "jyo" finds nothing, and a word with no nearby term in the
+index (e.g. "exhilarated", which Class VI lacks) matches nothing either.
+
+Results are cached per query word, since conversational input repeats words
+heavily.
+"""
+from __future__ import annotations
+
+import functools
+from dataclasses import dataclass
+from itertools import accumulate, chain, product
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from rapidfuzz.distance import Levenshtein as _levenshtein
+except ImportError:  # pragma: no cover - optional dependency
+    _levenshtein = None
+
+from roget_index import normalize_term
+
+# (suffix, replacement), longest first; applied up to twice ("fearfulness" ->
+# "fearful" -> "fear"), never leaving fewer than MIN_STEM characters.
+_SUFFIXES = [
+    ("ations", "at"), ("lessly", ""), ("ation", "at"), ("fully", ""), ("ingly", ""), ("full", ""),
+    ("ities", ""), ("ments", ""), ("edly", ""), ("ness", ""), ("ment", ""), ("ings", ""),
+    ("ity", ""), ("ous", ""), ("ful", ""), ("ing", ""), ("ies", "y"), ("ied", "y"), ("ily", "y"),
+    ("ly", ""), ("ed", ""), ("es", ""), ("s", ""),
+]
+MIN_STEM = 3
+SHORT_STEM = 5  # keys up to this length are looked up by deletion variants
+MAX_CANDIDATES = 32  # trigram candidates verified per query at most
+
+
+def stem(word: str) -> str:
+    """Strip common English inflectional and derivational suffixes."""
+    for _ in range(2):
+        for suffix, replacement in _SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) + len(replacement) >= MIN_STEM:
+                if suffix == "s" and word.endswith("ss"):
+                    continue
+                word = word[: len(word) - len(suffix)] + replacement
+                break
+        else:
+            break
+    if len(word) > MIN_STEM and word.endswith("e"):
+        word = word[:-1]
+    if len(word) > MIN_STEM and word[-1] == word[-2] and word[-1] not in "lsz":
+        word = word[:-1]
+    return word
+
+
+def distance_from(word: str) -> Callable[[str], int]:
+    """Return a function giving the Levenshtein distance from `word` to its argument.
+
+    Uses Hyyro's bit-parallel form of Myers' algorithm: the per-character
+    bitmasks of `word` are built once, and each comparison costs a handful
+    of integer operations per character of the other string.
+    """
+    if _levenshtein is not None:
+        return functools.partial(_levenshtein.distance, word)
+    if not word:
+        return len
+    masks: Dict[str, int] = {}
+    for i, char in enumerate(word):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    full = (1 << len(word)) - 1
+    last = 1 << (len(word) - 1)
+
+    def distance(other: str) -> int:
+        score, vp, vn = len(word), full, 0
+        for char in other:
+            eq = masks.get(char, 0)
+            xv = eq | vn
+            xh = (((eq & vp) + vp) ^ vp) | eq
+            hp = vn | (~(xh | vp) & full)
+            hn = vp & xh
+            if hp & last:
+                score += 1
+            elif hn & last:
+                score -= 1
+            hp = ((hp << 1) | 1) & full
+            hn = (hn << 1) & full
+            vp = hn | (~(xv | hp) & full)
+            vn = hp & xv
+        return score
+
+    return distance
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between `a` and `b`."""
+    return distance_from(a)(b)
+
+
+def max_distance(length: int) -> int:
+    """Edit budget for a stem of `length` characters.
+
+    0 up to 3 characters (one edit turns most short words into other words),
+    1 up to 6 and 2 beyond.
+    """
+    if length <= 3:
+        return 0
+    return 1 if length <= 6 else 2
+
+
+def deletions(word: str) -> List[str]:
+    """`word` and every string obtained by deleting one of its characters."""
+    return [word] + [word[:i] + word[i + 1:] for i in range(len(word))]
+
+
+def trigrams(word: str) -> List[str]:
+    padded = f"${word}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class BKTree:
+    """Burkhard-Keller tree over strings under Levenshtein distance."""
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        self._root: Optional[Tuple[str, Dict[int, tuple]]] = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        if self._root is None:
+            self._root = (word, {})
+            return
+        node = self._root
+        distance_to = distance_from(word)
+        while True:
+            distance = distance_to(node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word: str, radius: int) -> List[Tuple[str, int]]:
+        """All stored words within `radius` edits of `word`, with their distances."""
+        found = []
+        distance_to = distance_from(word)
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            candidate, children = stack.pop()
+            distance = distance_to(candidate)
+            if distance <= radius:
+                found.append((candidate, distance))
+            for key in range(max(1, distance - radius), distance + radius + 1):
+                child = children.get(key)
+                if child is not None:
+                    stack.append(child)
+        return found
+
+
+@dataclass(frozen=True)
+class Match:
+    term: str
+    score: float
+    distance: int
+
+
+class FuzzyMatcher:
+    """Top-k fuzzy lookup of words against a fixed set of terms.
+
+    `cache_size` bounds the per-word result cache (see `cache_info`).
+    """
+
+    def __init__(self, terms: Iterable[str], cache_size: int = 65536) -> None:
+        # Every term is reachable through both its surface form and its stem.
+        self._by_key: Dict[str, List[str]] = {}
+        for term in dict.fromkeys(normalize_term(term) for term in terms):
+            for key in dict.fromkeys((term, stem(term))):
+                self._by_key.setdefault(key, []).append(term)
+        # Keys are ordered by length, so the keys of a length range are one id range.
+        self._keys = sorted(self._by_key, key=lambda key: (len(key), key))
+        longest = len(self._keys[-1]) if self._keys else 0
+        self._length_start = [0] * (longest + 2)
+        for key in self._keys:
+            self._length_start[len(key) + 1] += 1
+        self._length_start = list(accumulate(self._length_start))
+
+        grams: Dict[Tuple[str, int], List[int]] = {}
+        self._deletions: Dict[str, List[int]] = {}
+        self._gram_counts = np.zeros(len(self._keys), dtype=np.int32)
+        for i, key in enumerate(self._keys):
+            key_grams = set(trigrams(key))
+            self._gram_counts[i] = len(key_grams)
+            for gram in key_grams:
+                grams.setdefault((gram, len(key)), []).append(i)
+            # One longer than SHORT_STEM, so an insertion into a short query is found.
+            if len(key) <= SHORT_STEM + 1:
+                for variant in deletions(key):
+                    self._deletions.setdefault(variant, []).append(i)
+        # Posting lists packed into one array; (gram, key length) -> (start, end).
+        self._spans: Dict[Tuple[str, int], Tuple[int, int]] = {}
+        self._postings = np.empty(sum(map(len, grams.values())), dtype=np.int32)
+        offset = 0
+        for gram_key, ids in grams.items():
+            self._postings[offset:offset + len(ids)] = ids
+            self._spans[gram_key] = (offset, offset + len(ids))
+            offset += len(ids)
+        self._tree: Optional[BKTree] = None
+        self._terms = len({term for terms in self._by_key.values() for term in terms})
+        self.match = functools.lru_cache(maxsize=cache_size)(self._match)
+
+    def __len__(self) -> int:
+        return self._terms
+
+    def cache_info(self):
+        return self.match.cache_info()
+
+    def _candidates(self, query: str, k: int) -> List[Tuple[str, int]]:
+        """(key, distance) pairs within the edit budget of `query`."""
+        radius = max_distance(len(query))
+        if radius == 0:
+            return [(query, 0)] if query in self._by_key else []
+        if len(query) <= SHORT_STEM:  # radius is 1 here
+            found = self._near(query) + self._scan(query, radius, k, SHORT_STEM + 2)
+        else:
+            found = self._scan(query, radius, k)
+        return [(self._keys[i], distance) for i, distance in found]
+
+    def _near(self, query: str) -> List[Tuple[int, int]]:
+        candidates = set(chain.from_iterable(
+            self._deletions.get(variant, ()) for variant in deletions(query)
+        ))
+        distance_to = distance_from(query)
+        found = []
+        for i in candidates:
+            distance = distance_to(self._keys[i])
+            if distance <= 1:
+                found.append((i, distance))
+        return found
+
+    def _scan(self, query: str, radius: int, k: int, min_length: int = 0) -> List[Tuple[int, int]]:
+        shortest = max(min_length, len(query) - radius)
+        longest = min(len(query) + radius, len(self._length_start) - 2)
+        if shortest > longest:
+            return []
+        grams = set(trigrams(query))
+        spans = [
+            self._spans[gram_key]
+            for gram_key in product(grams, range(shortest, longest + 1))
+            if gram_key in self._spans
+        ]
+        if not spans:
+            return []
+        low, high = self._length_start[shortest], self._length_start[longest + 1]
+        ids = np.concatenate([self._postings[start:end] for start, end in spans])
+        shared = np.bincount(ids - low, minlength=high - low)
+        # An edit removes at most three trigrams from either side, which
+        # bounds the distance from below by the trigrams not shared.
+        candidates = np.flatnonzero(shared >= len(grams) - 3 * radius)
+        shared = shared[candidates]
+        candidates += low
+        bound = (np.maximum(len(grams), self._gram_counts[candidates]) - shared + 2) // 3
+        keep = bound <= radius
+        candidates, bound, shared = candidates[keep], bound[keep], shared[keep]
+        order = np.lexsort((-shared, bound))[:MAX_CANDIDATES]
+
+        distance_to = distance_from(query)
+        found: List[Tuple[int, int]] = []
+        distances: List[int] = []
+        for i, lower in zip(candidates[order].tolist(), bound[order].tolist()):
+            if len(distances) >= k and lower > sorted(distances)[k - 1]:
+                break  # nothing left can beat the k best found so far
+            distance = distance_to(self._keys[i])
+            if distance <= radius:
+                found.append((i, distance))
+                distances.append(distance)
+        return found
+
+    def _match(self, word: str, k: int = 5, min_score: float = 0.6) -> Tuple[Match, ...]:
+        word = normalize_term(word)
+        # Misspelled words can stem oddly, so the surface form is tried too.
+        queries = list(dict.fromkeys((word, stem(word))))
+        best: Dict[str, Tuple[float, int]] = {}
+
+        def consider(query: str, key: str, distance: int) -> None:
+            base = 1.0 - distance / max(len(query), len(key))
+            for term in self._by_key[key]:
+                score = 1.0 if term == word else round(0.95 * base, 4)
+                if score >= min_score and score > best.get(term, (0.0, 0))[0]:
+                    best[term] = (score, distance)
+
+        for query in queries:
+            if query in self._by_key:
+                consider(query, query, 0)
+        if len(best) < k:  # exact and same-stem terms outrank anything fuzzy
+            for query in queries:
+                for key, distance in self._candidates(query, k):
+                    consider(query, key, distance)
+        # Same score: prefer terms closer in length to the input.
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], abs(len(item[0]) - len(word)),
+                                                        item[0]))
+        return tuple(Match(term, score, distance) for term, (score, distance) in ranked[:k])
+
+    def within(self, word: str, radius: int) -> List[Tuple[str, int]]:
+        """Every term whose surface form or stem is within `radius` edits of `word`.
+
+        Exhaustive, unlike `match`; backed by a BK-tree built on first use.
+        """
+        if self._tree is None:
+            self._tree = BKTree(self._keys)
+        best: Dict[str, int] = {}
+        for key, distance in self._tree.search(normalize_term(word), radius):
+            for term in self._by_key[key]:
+                best[term] = min(distance, best.get(term, distance))
+        return sorted(best.items(), key=lambda item: (item[1], item[0]))
+
+    def best(self, word: str, min_score: float = 0.6) -> Optional[str]:
+        """The single best matching term for `word`, or None."""
+        matches = self.match(word, 1, min_score)
+        return matches[0].term if matches else None
+
+
+@functools.lru_cache(maxsize=1)
+def default_matcher() -> FuzzyMatcher:
+    """Matcher over every term of the built-in Class VI index."""
+    from roget_index import default_index
+
+    return FuzzyMatcher(default_index().terms())
+
+
+if __name__ == "__main__":  # pragma: no cover - manual use
+    matcher = default_matcher()
+    for word in ("delihgted", "fearfully", "anxeity", "awe", "reverant", "joyous"):
+        print(word, "->", [(m.term, m.score) for m in matcher.match(word)])
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Query engine over Roget's Thesaurus Class VI.
+
+`ThesaurusIndex` flattens a `ClassVI` once into lookup tables so that the
+thesaurus can be consulted on every turn:
+
+* an inverted index from each term to where it occurs, as
+  (section, title, category) postings (``awe`` -> Wonder and Reverence);
+* a character trie for prefix completion, each node holding the sorted
+  terms below it;
+* a synonym graph linking terms that share a category, with a head word
+  (the category name, or the title of a plain list section) in each group.
+
+Terms are matched case-insensitively with runs of whitespace collapsed.
+"""
+from __future__ import annotations
+
+import functools
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from roget_system import ClassVI, build_class_vi
+
+_COMPLETIONS = ""  # trie key for the sorted terms below a node; never a character
+
+
+def normalize_term(term: str) -> str:
+    return " ".join(term.lower().split())
+
+
+@dataclass(frozen=True)
+class Posting:
+    """One place a term occurs; `category` is None in plain list sections."""
+
+    section: str
+    title: str
+    category: Optional[str]
+    term: str
+
+    @property
+    def head(self) -> str:
+        return self.category or self.title
+
+
+class ThesaurusIndex:
+    """Precomputed lookups over a `ClassVI`.
+
+    `lookup` and `neighbours` are dictionary hits; `complete` walks the
+    prefix and slices the completions stored at its node.
+    """
+
+    def __init__(self, class_vi: ClassVI) -> None:
+        self._postings: Dict[str, List[Posting]] = {}
+        self._groups: Dict[Tuple[str, str, Optional[str]], List[str]] = {}
+        self._heads: Dict[str, Dict[str, None]] = {}
+        self._trie: dict = {_COMPLETIONS: []}
+        for section_name, sects in class_vi.sections.items():
+            for sec in sects:
+                if isinstance(sec.entries, dict):
+                    for cat, terms in sec.entries.items():
+                        self._add_group(section_name, sec.title, cat, [cat, *terms])
+                else:
+                    self._add_group(section_name, sec.title, None, [sec.title, *sec.entries])
+        self._neighbours = {term: self._link(term) for term in self._postings}
+        stack = [self._trie]
+        while stack:
+            node = stack.pop()
+            node[_COMPLETIONS].sort()
+            stack.extend(child for char, child in node.items() if char)
+
+    def _add_group(self, section: str, title: str, category: Optional[str],
+                   terms: List[str]) -> None:
+        members = self._groups.setdefault((section, title, category), [])
+        head_members = self._heads.setdefault(normalize_term(category or title), {})
+        for term in terms:
+            posting = Posting(section, title, category, term)
+            key = normalize_term(term)
+            postings = self._postings.setdefault(key, [])
+            if key in members:
+                continue
+            members.append(key)
+            head_members[key] = None
+            if not postings:
+                self._insert(key)
+            postings.append(posting)
+
+    def _insert(self, key: str) -> None:
+        node = self._trie
+        node[_COMPLETIONS].append(key)
+        for char in key:
+            node = node.setdefault(char, {_COMPLETIONS: []})
+            node[_COMPLETIONS].append(key)
+
+    def _link(self, key: str) -> Tuple[str, ...]:
+        seen = {key: None}
+        for posting in self._postings[key]:
+            group = (posting.section, posting.title, posting.category)
+            seen.update(dict.fromkeys(self._groups[group]))
+        del seen[key]
+        return tuple(seen)
+
+    def __contains__(self, term: str) -> bool:
+        return normalize_term(term) in self._postings
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def terms(self) -> Iterator[str]:
+        return iter(self._postings)
+
+    def lookup(self, term: str) -> Tuple[Posting, ...]:
+        """Every (section, title, category) under which `term` is listed."""
+        return tuple(self._postings.get(normalize_term(term), ()))
+
+    def categories(self, term: str) -> List[str]:
+        """Head words of the groups containing `term`, in thesaurus order."""
+        return list(dict.fromkeys(posting.head for posting in self.lookup(term)))
+
+    def members(self, head: str) -> List[str]:
+        """Terms grouped under the category or list section named `head`."""
+        return list(self._heads.get(normalize_term(head), ()))
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """Terms starting with `prefix` in lexicographic order, at most `limit`."""
+        node = self._trie
+        for char in normalize_term(prefix):
+            node = node.get(char)
+            if node is None:
+                return []
+        return node[_COMPLETIONS][:limit]
+
+    def neighbours(self, term: str, depth: int = 1) -> List[str]:
+        """Terms reachable from `term` through at most `depth` shared categories.
+
+        Nearer terms come first; `term` itself is not included.
+        """
+        start = normalize_term(term)
+        if start not in self._neighbours:
+            return []
+        seen = {start: None}
+        frontier = [start]
+        for _ in range(depth):
+            following = []
+            for key in frontier:
+                for neighbour in self._neighbours[key]:
+                    if neighbour not in seen:
+                        seen[neighbour] = None
+                        following.append(neighbour)
+            frontier = following
+        del seen[start]
+        return list(seen)
+
+
+@functools.lru_cache(maxsize=1)
+def default_index() -> ThesaurusIndex:
+    """The index over the built-in Class VI, built on first use."""
+    return ThesaurusIndex(build_class_vi())
+
+
+if __name__ == "__main__":  # pragma: no cover - manual use
+    index = default_index()
+    print(f"{len(index)} terms indexed")
+    for posting in index.lookup("awe"):
+        print(f"awe -> {posting.section} / {posting.title} / {posting.category}")
+    print("complete('re'):", index.complete("re", limit=8))
+    print("neighbours('awe'):", index.neighbours("awe"))
@@ -46,6 +46,12 @@ class ClassVI:
         with open(path, "w", encoding="utf-8") as f:
             json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
 
+    def save_binary(self, path: str) -> None:
+        """Save the thesaurus in the compact binary format (see roget_binary)."""
+        from roget_binary import save_binary
+
+        save_binary(self, path)
+
     def save_pdf(self, path: str) -> None:
         """Generate a PDF of the thesaurus data (if FPDF is available)."""
         if FPDF is None:
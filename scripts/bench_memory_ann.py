@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""
+bench_memory_ann.py
+Compares the approximate IVF memory index against the exact index.
+Reports build time, per-query latency and recall@k for a sweep of n_probe.
+
+    python scripts/bench_memory_ann.py --size 1000000 --dim 64 --n-lists 1024
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "memory"))
+
+from ivf_index import IVFIndex
+from vector_index import VectorIndex
+
+
+def clustered_vectors(size, dim, clusters, seed):
+    """Synthetic embeddings with topical structure, like real memories."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size)
+    noise = rng.standard_normal((size, dim)).astype(np.float32)
+    return centers[labels] + 0.5 * noise
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--n-lists", type=int, default=256)
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data = clustered_vectors(args.size, args.dim, max(16, args.n_lists // 4), args.seed)
+    queries = clustered_vectors(args.queries, args.dim, max(16, args.n_lists // 4), args.seed + 1)
+
+    exact = VectorIndex(args.dim, initial_capacity=args.size)
+    exact.add_batch(data)
+    started = time.perf_counter()
+    truth = [set(exact.search(q, args.top_k)[0].tolist()) for q in queries]
+    exact_ms = (time.perf_counter() - started) / args.queries * 1000
+    print(f"exact       size={args.size} dim={args.dim} latency={exact_ms:.3f} ms/query")
+
+    ivf = IVFIndex(args.dim, n_lists=args.n_lists)
+    started = time.perf_counter()
+    ivf.add_batch(data)
+    if not ivf.is_trained:
+        ivf.train()
+    print(f"ivf build   n_lists={args.n_lists} {time.perf_counter() - started:.2f} s")
+
+    for n_probe in args.n_probe:
+        hits = 0
+        started = time.perf_counter()
+        for query, expected in zip(queries, truth):
+            ids, _ = ivf.search(query, args.top_k, n_probe=n_probe)
+            hits += len(expected.intersection(ids.tolist()))
+        latency_ms = (time.perf_counter() - started) / args.queries * 1000
+        recall = hits / (args.top_k * args.queries)
+        print(
+            f"ivf         n_probe={n_probe:<4} recall@{args.top_k}={recall:.3f} "
+            f"latency={latency_ms:.3f} ms/query speedup={exact_ms / latency_ms:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
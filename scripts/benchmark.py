@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+
+"""
+benchmark.py
+Benchmarks the AETHERIUS pipeline and compares the results against a baseline.
+Results are written as JSON; with --baseline, any metric that got worse by more
+than --tolerance is reported as a regression (and fails the run with --strict).
+
+    python scripts/benchmark.py --save-baseline          # record bench_baseline.json
+    python scripts/benchmark.py --baseline bench_baseline.json --strict
+    python scripts/benchmark.py --only memory --sizes 10000 100000 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "architecture"))
+sys.path.append(os.path.join(ROOT, "memory"))
+sys.path.append(os.path.join(ROOT, "llm_interface"))
+
+CASES = []
+
+
+def case(group):
+    """Registers a benchmark function under `group` (selectable with --only)."""
+    def register(function):
+        CASES.append((group, function))
+        return function
+    return register
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def timed(function, repeat):
+    """Runs `function` `repeat` times and returns the durations in seconds."""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def synthetic_texts(count, seed, vocabulary=5000, words=12):
+    rng = random.Random(seed)
+    lexicon = [f"w{i}" for i in range(vocabulary)]
+    return [" ".join(rng.choices(lexicon, k=words)) for _ in range(count)]
+
+
+# ----------------------------------------------------------------------
+# Cases. Each calls record(name, value, unit, better) for its metrics.
+# ----------------------------------------------------------------------
+@case("memory")
+def bench_memory(args, record):
+    from memory_manager import MemoryManager
+
+    for size in args.sizes:
+        memory = MemoryManager()
+        texts = synthetic_texts(size, seed=size)
+        started = time.perf_counter()
+        for offset in range(0, size, 10000):
+            memory.store_memories(texts[offset:offset + 10000])
+        record(f"memory.store_bulk.{size}", (time.perf_counter() - started) / size * 1e6, "us/item")
+
+        extra = synthetic_texts(args.repeat, seed=size + 1)
+        durations = [0.0] * len(extra)
+        for i, text in enumerate(extra):
+            started = time.perf_counter()
+            memory.store_memory(text)
+            durations[i] = time.perf_counter() - started
+        record(f"memory.store_one.{size}.p50", percentile(durations, 50) * 1e3, "ms")
+
+        queries = iter(synthetic_texts(args.repeat, seed=size + 2, words=4))
+        durations = timed(lambda: memory.search_memory(next(queries), top_k=5), args.repeat)
+        record(f"memory.search.{size}.p50", percentile(durations, 50) * 1e3, "ms")
+        record(f"memory.search.{size}.p95", percentile(durations, 95) * 1e3, "ms")
+        memory.close()
+
+
+@case("llm")
+def bench_llm(args, record):
+    from backends import SimulatedBackend
+    from llm_connector import LLMConnector
+
+    requests = args.repeat * 10
+    for label, window in (("unbatched", None), ("batched", 0.002)):
+        llm = LLMConnector(
+            backend=SimulatedBackend(latency=0.005), max_concurrency=16, batch_window=window
+        )
+
+        async def burst():
+            await asyncio.gather(*(llm.agenerate(f"prompt {i}") for i in range(requests)))
+
+        started = time.perf_counter()
+        asyncio.run(burst())
+        record(f"llm.throughput.{label}", requests / (time.perf_counter() - started),
+               "req/s", better="higher")
+        llm.close()
+
+
+@case("core_loop")
+def bench_core_loop(args, record):
+    from core_loop import CoreLoopEngine, Session
+    from llm_connector import LLMConnector
+    from memory_manager import MemoryManager
+    from server import collect_text
+    from agents.task_executor import TaskExecutor
+
+    memory = MemoryManager()
+    memory.store_memories(synthetic_texts(1000, seed=7))
+    executor = TaskExecutor(default_timeout=30)
+    llm = LLMConnector()
+    # The preloaded memories belong to no session; recall them all.
+    engine = CoreLoopEngine(memory, executor, speaker=collect_text, llm=llm, shared_memory=True)
+
+    async def sequential():
+        session = Session()
+        durations = []
+        for turn in range(args.repeat):
+            started = time.perf_counter()
+            await engine.run_turn(f"turn {turn}: what should we build?", session)
+            durations.append(time.perf_counter() - started)
+        await engine.drain()
+        return durations
+
+    async def concurrent(sessions):
+        started = time.perf_counter()
+        await asyncio.gather(*(engine.run_turn(f"session {i} says hello") for i in range(sessions)))
+        await engine.drain()
+        return sessions / (time.perf_counter() - started)
+
+    durations = asyncio.run(sequential())
+    record("core_loop.turn.p50", percentile(durations, 50) * 1e3, "ms")
+    record("core_loop.turn.p95", percentile(durations, 95) * 1e3, "ms")
+    record("core_loop.throughput.32_sessions", asyncio.run(concurrent(32)), "turns/s",
+           better="higher")
+    llm.close()
+    executor.shutdown()
+    memory.close()
+
+
+@case("agents")
+def bench_agents(args, record):
+    from agents.agent_manager import AgentManager
+    from agents.task_executor import TaskExecutor
+
+    manager = AgentManager()
+    calls = args.repeat * 100
+    started = time.perf_counter()
+    for i in range(calls):
+        manager.execute_task("web_search", query="benchmark")
+    record("agents.execute_task", (time.perf_counter() - started) / calls * 1e6, "us/call")
+
+    executor = TaskExecutor(manager)
+    tasks = [
+        {"task_name": f"task{i}", "agent": "web_search", "params": {"query": f"q{i}"}}
+        for i in range(args.repeat)
+    ]
+    executor.run(tasks)  # warm the pool
+    durations = timed(lambda: executor.run(tasks), 10)
+    record("agents.executor_dispatch", percentile(durations, 50) / len(tasks) * 1e6, "us/task")
+    executor.shutdown()
+
+
+@case("roget")
+def bench_roget(args, record):
+    import roget_system
+
+    durations = timed(roget_system.build_class_vi, args.repeat)
+    record("roget.build", percentile(durations, 50) * 1e3, "ms")
+    class_vi = roget_system.build_class_vi()
+    durations = timed(class_vi.to_dict, args.repeat)
+    record("roget.to_dict", percentile(durations, 50) * 1e3, "ms")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "class_vi.json")
+        durations = timed(lambda: class_vi.save_json(path), args.repeat)
+        record("roget.save_json", percentile(durations, 50) * 1e3, "ms")
+        if roget_system.FPDF is not None:
+            path = os.path.join(tmp, "class_vi.pdf")
+            durations = timed(lambda: class_vi.save_pdf(path), max(1, args.repeat // 10))
+            record("roget.save_pdf", percentile(durations, 50) * 1e3, "ms")
+
+        from roget_binary import load_binary
+
+        path = os.path.join(tmp, "class_vi.bin")
+        durations = timed(lambda: class_vi.save_binary(path), args.repeat)
+        record("roget.save_binary", percentile(durations, 50) * 1e3, "ms")
+
+        def load():
+            loaded = load_binary(path)
+            loaded.sections.close()
+
+        def load_all():
+            loaded = load_binary(path)
+            loaded.to_dict()
+            loaded.sections.close()
+
+        record("roget.load_binary", percentile(timed(load, args.repeat), 50) * 1e3, "ms")
+        record("roget.load_binary_full", percentile(timed(load_all, args.repeat), 50) * 1e3, "ms")
+
+        from roget_export import export, export_shards
+
+        for fmt in ("json", "jsonl", "pdf"):
+            path = os.path.join(tmp, f"stream.{fmt}")
+            durations = timed(lambda: export(class_vi, path), max(1, args.repeat // 10))
+            record(f"roget.export_{fmt}", percentile(durations, 50) * 1e3, "ms")
+        shards = os.path.join(tmp, "shards")
+        export_shards(class_vi, shards, formats=("json", "pdf"))
+        durations = timed(lambda: export_shards(class_vi, shards, formats=("json", "pdf")),
+                          args.repeat)
+        record("roget.export_shards_unchanged", percentile(durations, 50) * 1e3, "ms")
+
+    from roget_index import ThesaurusIndex
+
+    durations = timed(lambda: ThesaurusIndex(class_vi), args.repeat)
+    record("roget.index_build", percentile(durations, 50) * 1e3, "ms")
+    index = ThesaurusIndex(class_vi)
+    terms = list(index.terms())
+    calls = args.repeat * 100
+    queries = {
+        "lookup": index.lookup,
+        "complete": lambda term: index.complete(term[:2], limit=10),
+        "neighbours": index.neighbours,
+    }
+    for name, query in queries.items():
+        started = time.perf_counter()
+        for i in range(calls):
+            query(terms[i % len(terms)])
+        record(f"roget.{name}", (time.perf_counter() - started) / calls * 1e6, "us/call")
+
+    from roget_fuzzy import FuzzyMatcher
+
+    durations = timed(lambda: FuzzyMatcher(terms), max(1, args.repeat // 10))
+    record("roget.fuzzy_build", percentile(durations, 50) * 1e3, "ms")
+    matcher = FuzzyMatcher(terms)
+    rng = random.Random(11)
+    typos = []
+    for _ in range(args.repeat * 10):
+        term = rng.choice(terms)
+        i = rng.randrange(len(term))
+        typos.append(term[:i] + rng.choice("aeiourst") + term[i + 1:])
+    started = time.perf_counter()
+    for word in typos:
+        matcher.match(word)
+    record("roget.fuzzy_match_uncached", len(typos) / (time.perf_counter() - started),
+           "queries/s", better="higher")
+    started = time.perf_counter()
+    for word in typos:
+        matcher.match(word)
+    record("roget.fuzzy_match_cached", len(typos) / (time.perf_counter() - started),
+           "queries/s", better="higher")
+
+
+@case("affect")
+def bench_affect(args, record):
+    from affect_lexicon import AffectLexicon
+    from aetherius_logic import expand_input
+    from roget_index import default_index
+
+    durations = timed(AffectLexicon, max(1, args.repeat // 10))
+    record("affect.lexicon_build", percentile(durations, 50) * 1e3, "ms")
+    lexicon = AffectLexicon()
+
+    # Filler text with one or two thesaurus terms per sentence, some of them
+    # inflected or misspelled.
+    rng = random.Random(13)
+    terms = list(default_index().terms())
+    corpus = synthetic_texts(args.repeat * 1000, seed=13)
+    for i, text in enumerate(corpus):
+        words = text.split()
+        for _ in range(rng.randint(1, 2)):
+            term = rng.choice(terms)
+            if rng.random() < 0.2:
+                term += rng.choice(["s", "ed", "ly", "ness"])
+            elif rng.random() < 0.1 and len(term) > 6:
+                j = rng.randrange(len(term))
+                term = term[:j] + rng.choice("aeiou") + term[j + 1:]
+            words[rng.randrange(len(words))] = term
+        corpus[i] = " ".join(words)
+    tokens = sum(len(text.split()) for text in corpus)
+
+    for batch in (100, 1000):
+        started = time.perf_counter()
+        for offset in range(0, len(corpus), batch):
+            lexicon.encode(corpus[offset:offset + batch])
+        elapsed = time.perf_counter() - started
+        record(f"affect.encode.batch_{batch}", len(corpus) / elapsed, "texts/s", better="higher")
+        record(f"affect.encode.batch_{batch}.tokens", tokens / elapsed, "tokens/s",
+               better="higher")
+    durations = timed(lambda: expand_input(rng.choice(corpus)), args.repeat * 10)
+    record("affect.expand_input.p50", percentile(durations, 50) * 1e6, "us")
+
+
+# ----------------------------------------------------------------------
+# Reporting
+# ----------------------------------------------------------------------
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Returns (name, old, new, change) for every metric worse than `tolerance`."""
+    regressions = []
+    for name, metric in results.items():
+        old = baseline.get(name)
+        if old is None or not old["value"]:
+            continue
+        change = metric["value"] / old["value"] - 1.0
+        if metric["better"] == "higher":
+            change = -change
+        if change > tolerance:
+            regressions.append((name, old["value"], metric["value"], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--only", nargs="+", choices=sorted({group for group, _ in CASES}))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000],
+                        help="memory store sizes (add 1000000 for the full run)")
+    parser.add_argument("--repeat", type=int, default=100, help="samples per latency metric")
+    parser.add_argument("--output", default=os.path.join(ROOT, "bench_output.json"))
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--save-baseline", nargs="?", const=os.path.join(ROOT, "bench_baseline.json"),
+                        help="also write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown before a metric counts as a regression")
+    parser.add_argument("--strict", action="store_true", help="exit 1 on any regression")
+    args = parser.parse_args()
+
+    results = {}
+
+    def record(name, value, unit, better="lower"):
+        results[name] = {"value": value, "unit": unit, "better": better}
+        print(f"{name:<40} {value:>12.3f} {unit}", flush=True)
+
+    for group, function in CASES:
+        if args.only is None or group in args.only:
+            function(args, record)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for name, old, new, change in regressions:
+            print(f"REGRESSION {name}: {old:.3f} -> {new:.3f} ({change:+.0%})")
+        if not regressions:
+            print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+        if regressions and args.strict:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,17 +6,53 @@ To begin the recursive cycle of Aetherius, run this script.
 Ensure that `.env` contains your OPENAI_API_KEY and dependencies are installed.
 """
 
+import logging
 import sys
 import os
 
 # Expand Python path to include modules
+# The repository root makes packages such as `agents` importable by name.
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "architecture"))
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "memory"))
-sys.path.append(os.path.join(os.path.dirname(__file__), "..", "agents"))
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "llm_interface"))
 
 from core_loop import core_loop
+from llm_connector import LLMConnector
+from response_cache import ResponseCache
+from memory_manager import MemoryManager
+from agents.task_executor import TaskExecutor
+from tracing import NULL_TRACER, Tracer
+
+# Memories persist here across restarts; override with AETHERIUS_MEMORY_DIR.
+MEMORY_DIR = os.environ.get(
+    "AETHERIUS_MEMORY_DIR",
+    os.path.join(os.path.dirname(__file__), "..", ".aetherius", "memory"),
+)
+# Cached LLM responses are saved here on exit; override with AETHERIUS_LLM_CACHE.
+LLM_CACHE_PATH = os.environ.get(
+    "AETHERIUS_LLM_CACHE",
+    os.path.join(os.path.dirname(__file__), "..", ".aetherius", "llm_cache.json"),
+)
+# Log verbosity (DEBUG, INFO, WARNING, ...); stage logging is INFO.
+LOG_LEVEL = os.environ.get("AETHERIUS_LOG_LEVEL", "WARNING")
+# When set, per-stage spans are written here as a Chrome trace on exit.
+TRACE_PATH = os.environ.get("AETHERIUS_TRACE")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL.upper(), format="%(levelname)s: %(message)s")
     print("\n Sigil engraved. The invocation begins...\n")
-    core_loop()
+    tracer = Tracer() if TRACE_PATH else NULL_TRACER
+    memory = MemoryManager(persist_dir=MEMORY_DIR, tracer=tracer)
+    executor = TaskExecutor(default_timeout=30, tracer=tracer)
+    llm_cache = ResponseCache(ttl=24 * 3600, path=LLM_CACHE_PATH)
+    llm = LLMConnector(cache=llm_cache, tracer=tracer)
+    try:
+        core_loop(memory, executor, tracer, llm)
+    finally:
+        llm.close()
+        llm_cache.save()
+        executor.shutdown()
+        memory.close()
+        if TRACE_PATH:
+            tracer.export(TRACE_PATH)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+"""
+load_generator.py
+Drives a running AETHERIUS server with concurrent sessions and reports throughput.
+Each session keeps one keep-alive connection and sends turns back to back;
+a 429 is counted and retried after a short pause.
+
+    python scripts/serve.py &
+    python scripts/load_generator.py --sessions 64 --duration 30
+    python scripts/load_generator.py --spawn --sessions 64   # in-process server
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# The repository root makes packages such as `agents` importable by name.
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "architecture"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "memory"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "llm_interface"))
+
+
+async def post_turn(reader, writer, host, payload):
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(
+        f"POST /v1/turn HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def run_session(index, args, deadline, stats):
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    session_id = None
+    turn = 0
+    try:
+        while time.monotonic() < deadline:
+            payload = {"input": f"session {index} turn {turn}: what should we build next?"}
+            if session_id:
+                payload["session_id"] = session_id
+            started = time.perf_counter()
+            status, reply = await post_turn(reader, writer, args.host, payload)
+            if status == 200:
+                stats["latencies"].append(time.perf_counter() - started)
+                session_id = reply["session_id"]
+                turn += 1
+            elif status == 429:
+                stats["rejected"] += 1
+                await asyncio.sleep(0.05)
+            else:
+                stats["errors"] += 1
+                break
+    finally:
+        writer.close()
+
+
+async def main(args):
+    server = None
+    if args.spawn:
+        from memory_manager import MemoryManager
+        from llm_connector import LLMConnector
+        from server import CoreLoopServer
+        from agents.task_executor import TaskExecutor
+        from tracing import Tracer
+
+        memory = MemoryManager(embed_batch_window=0.005)
+        executor = TaskExecutor(default_timeout=30)
+        llm = LLMConnector(batch_window=0.005)
+        server = await CoreLoopServer(
+            memory, executor, llm, Tracer(), host=args.host, port=0,
+            workers=args.workers, max_queue=args.max_queue,
+        ).start()
+        args.port = server.port
+
+    stats = {"latencies": [], "rejected": 0, "errors": 0}
+    started = time.monotonic()
+    deadline = started + args.duration
+    await asyncio.gather(*(run_session(i, args, deadline, stats) for i in range(args.sessions)))
+    elapsed = time.monotonic() - started
+
+    latencies = sorted(stats["latencies"])
+
+    def percentile(q):
+        return latencies[min(len(latencies) - 1, int(q / 100 * len(latencies)))] * 1000 if latencies else 0.0
+
+    print(f"sessions={args.sessions} duration={elapsed:.1f}s turns={len(latencies)} "
+          f"throughput={len(latencies) / elapsed:.1f} turns/s")
+    print(f"latency p50={percentile(50):.1f} ms p95={percentile(95):.1f} ms p99={percentile(99):.1f} ms")
+    print(f"rejected (429)={stats['rejected']} errors={stats['errors']}")
+
+    if server is not None:
+        await server.shutdown()
+        llm.close()
+        executor.shutdown()
+        memory.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--spawn", action="store_true", help="run a server in this process")
+    parser.add_argument("--workers", type=int, default=16, help="with --spawn")
+    parser.add_argument("--max-queue", type=int, default=64, help="with --spawn")
+    asyncio.run(main(parser.parse_args()))
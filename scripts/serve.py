@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+"""
+serve.py
+Runs AETHERIUS as a multi-session HTTP server (see architecture/server.py).
+
+    python scripts/serve.py --port 8080 --workers 16 --max-queue 64
+
+Stop it with Ctrl-C or SIGTERM; queued turns finish before it exits.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+# The repository root makes packages such as `agents` importable by name.
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "architecture"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "memory"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "llm_interface"))
+
+from launch import LLM_CACHE_PATH, LOG_LEVEL, MEMORY_DIR, TRACE_PATH
+from llm_connector import LLMConnector
+from memory_manager import MemoryManager
+from response_cache import ResponseCache
+from server import CoreLoopServer
+from agents.task_executor import TaskExecutor
+from tracing import Tracer
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=16, help="turns run concurrently")
+    parser.add_argument("--max-queue", type=int, default=64, help="queued turns before 429s")
+    parser.add_argument("--batch-window", type=float, default=0.005,
+                        help="seconds to coalesce LLM and embedding calls (0 disables)")
+    parser.add_argument("--shared-memory", action="store_true",
+                        help="let every session recall every other session's memories")
+    return parser.parse_args()
+
+
+async def main(args):
+    # Stage latencies feed /stats, so the server always traces.
+    tracer = Tracer()
+    window = args.batch_window or None
+    memory = MemoryManager(persist_dir=MEMORY_DIR, embed_batch_window=window, tracer=tracer)
+    executor = TaskExecutor(default_timeout=30, tracer=tracer)
+    llm_cache = ResponseCache(ttl=24 * 3600, path=LLM_CACHE_PATH)
+    llm = LLMConnector(cache=llm_cache, batch_window=window, tracer=tracer)
+    server = CoreLoopServer(
+        memory, executor, llm, tracer,
+        host=args.host, port=args.port, workers=args.workers, max_queue=args.max_queue,
+        shared_memory=args.shared_memory,
+    )
+    try:
+        await server.serve_forever()
+    finally:
+        llm.close()
+        llm_cache.save()
+        executor.shutdown()
+        memory.close()
+        if TRACE_PATH:
+            tracer.export(TRACE_PATH)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL.upper(), format="%(levelname)s: %(message)s")
+    asyncio.run(main(parse_args()))
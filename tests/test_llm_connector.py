@@ -0,0 +1,108 @@
+# AETHERIUS AGI - LLMConnector tests
+# Drives LLMConnector over HTTPBackend against an in-process MockLLMServer.
+#
+# Run with `python -m pytest tests` or `python -m unittest discover tests`.
+
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "llm_interface"))
+
+from backends import BackendError, HTTPBackend, MockLLMServer
+from llm_connector import LLMConnector
+
+
+class CountingServer(MockLLMServer):
+    """MockLLMServer that holds each response for `hold` seconds and records
+    the most requests it was answering at once."""
+
+    def __init__(self, hold=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.hold = hold
+        self.active = 0
+        self.peak = 0
+        self._active_lock = threading.Lock()
+
+    def respond(self, request):
+        with self._active_lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.hold)
+            return super().respond(request)
+        finally:
+            with self._active_lock:
+                self.active -= 1
+
+
+class LLMConnectorTest(unittest.TestCase):
+    def serve(self, server_class=MockLLMServer, **kwargs):
+        server = server_class(**kwargs).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def connect(self, server, **kwargs):
+        kwargs.setdefault("backoff_base", 0.001)
+        llm = LLMConnector("mock", backend=HTTPBackend(server.url), **kwargs)
+        self.addCleanup(llm.close)
+        return llm
+
+    def test_retries_transient_failures(self):
+        server = self.serve(failure_rate=0.4, seed=1)
+        llm = self.connect(server, max_retries=20)
+        for i in range(20):
+            self.assertEqual(llm.generate_response(f"p{i}"), f"Mock response from mock to: p{i}")
+        self.assertGreater(llm.retries, 0)
+        self.assertEqual(server.requests, 20 + llm.retries)
+
+    def test_gives_up_after_max_retries(self):
+        server = self.serve(failure_rate=1.0)
+        llm = self.connect(server, max_retries=2)
+        with self.assertRaises(BackendError) as raised:
+            llm.generate_response("hello")
+        self.assertEqual(raised.exception.status, 503)
+        self.assertEqual(server.requests, 3)
+
+    def test_stream_retries_before_first_token(self):
+        server = self.serve(failure_rate=0.5, seed=3)
+        llm = self.connect(server, max_retries=20)
+        for i in range(10):
+            chunks = list(llm.stream(f"tell me a story {i}"))
+            self.assertGreater(len(chunks), 1)
+            self.assertEqual("".join(chunks), f"Mock response from mock to: tell me a story {i}")
+        self.assertEqual(server.requests, 10 + llm.retries)
+
+    def test_batches_concurrent_requests(self):
+        server = self.serve(latency=0.02, failure_rate=0.2, seed=5)
+        llm = self.connect(server, max_retries=20, batch_window=0.02, max_batch_size=8)
+        prompts = [f"q{i}" for i in range(32)]
+        with ThreadPoolExecutor(32) as pool:
+            responses = list(pool.map(llm.generate_response, prompts))
+        self.assertEqual(responses, [f"Mock response from mock to: {p}" for p in prompts])
+        batching = llm.stats()["batching"]
+        self.assertGreater(batching["mean_batch_size"], 1)
+        self.assertLess(server.requests - llm.retries, len(prompts))
+
+    def test_concurrency_limit(self):
+        server = self.serve(CountingServer, hold=0.02)
+        llm = self.connect(server, max_concurrency=2)
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(llm.generate_response, [f"q{i}" for i in range(16)]))
+        self.assertEqual(server.peak, 2)
+
+    def test_rate_limit(self):
+        server = self.serve()
+        llm = self.connect(server, rate_limit=50, burst=1)
+        started = time.monotonic()
+        for i in range(11):
+            llm.generate_response(f"q{i}")
+        # One token up front, then one every 20 ms.
+        self.assertGreaterEqual(time.monotonic() - started, 0.19)
+
+
+if __name__ == "__main__":
+    unittest.main()
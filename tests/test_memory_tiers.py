@@ -0,0 +1,105 @@
+# AETHERIUS AGI - Memory tier tests
+# Keeps the hot tier, its metadata columns and the persistent cold tier
+# row-aligned across rejected stores, reopening and torn appends.
+#
+# Run with `python -m pytest tests` or `python -m unittest discover tests`.
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "memory"))
+
+from memory_manager import MemoryManager
+from persistent_store import PersistentMemoryStore
+
+
+class TornFile:
+    """File wrapper whose next write lands half its bytes and then fails."""
+
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, data):
+        self.file.write(data[:len(data) // 2])
+        self.file.flush()
+        raise OSError("disk full")
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+class MemoryTierTest(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp(prefix="aetherius-test-")
+        self.addCleanup(shutil.rmtree, self.path, ignore_errors=True)
+
+    def open(self):
+        memory = MemoryManager(persist_dir=self.path)
+        self.addCleanup(memory.close)
+        return memory
+
+    def assertAligned(self, memory):
+        hot = len(memory.memory_store)
+        self.assertEqual(len(memory.index), hot)
+        self.assertEqual(len(memory.metadata), hot)
+        if memory.disk is not None:
+            self.assertEqual(len(memory.disk.metadata_index()), len(memory.disk))
+
+    def test_rejected_metadata_leaves_tiers_aligned(self):
+        for persistent in (False, True):
+            with self.subTest(persistent=persistent):
+                memory = self.open() if persistent else MemoryManager()
+                memory.store_memories(["red apples", "green pears"], [{"rank": 1}, {"rank": 2}])
+                for bad in ({"rank": "first"}, {"tags": ["a", "b"]}, {1: "x"}):
+                    with self.assertRaises(TypeError):
+                        memory.store_memories(["blue plums", "ripe figs"], [{"rank": 3}, bad])
+                    self.assertAligned(memory)
+                self.assertEqual(len(memory), 2)
+
+                memory.store_memories(["yellow bananas"], [{"rank": 3}])
+                self.assertAligned(memory)
+                results = memory.search_memory("yellow bananas", filters={"rank": (3, None)})
+                self.assertEqual([result["text"] for result in results], ["yellow bananas"])
+
+    def test_filtered_search_of_cold_tier(self):
+        memory = self.open()
+        texts = [f"note {i} about the garden" for i in range(20)]
+        memory.store_memories(texts, [{"session": "ab"[i % 2]} for i in range(20)])
+        memory.close()
+
+        memory = self.open()
+        self.assertEqual(len(memory.memory_store), 0)
+        self.assertEqual(len(memory), 20)
+        results = memory.search_memory("garden note", top_k=20, filters={"session": "b"})
+        self.assertEqual(
+            sorted(result["text"] for result in results),
+            sorted(texts[1::2]),
+        )
+        self.assertTrue(all(result["metadata"]["session"] == "b" for result in results))
+
+    def test_reopen_after_torn_append(self):
+        store = PersistentMemoryStore(self.path, 4)
+        store.append(["one", "two"], [[1, 0, 0, 0], [0, 1, 0, 0]], [{"n": 1}, {"n": 2}])
+        store._offsets = TornFile(store._offsets)
+        with self.assertRaises(OSError):
+            store.append(["three"], [[0, 0, 1, 0]], [{"n": 3, "new": "field"}])
+        store.close()
+
+        store = PersistentMemoryStore(self.path, 4)
+        self.addCleanup(store.close)
+        self.assertEqual(len(store), 2)
+        self.assertEqual(len(store.metadata_index()), 2)
+        self.assertEqual(store.append(["four"], [[0, 0, 0, 1]], [{"n": 4}]), [2])
+        self.assertEqual([store.text(row) for row in range(3)], ["one", "two", "four"])
+        self.assertEqual(store.metadata(2), {"n": 4})
+        mask = store.metadata_index().mask({"n": (2, None)})
+        self.assertEqual(mask.nonzero()[0].tolist(), [1, 2])
+        ids, _ = store.search([0, 0, 0, 1], top_k=1)
+        self.assertEqual(ids.tolist(), [2])
+
+
+if __name__ == "__main__":
+    unittest.main()